@@ -1,52 +1,119 @@
 from __future__ import annotations
+import math
+import numpy as np
 import pandas as pd
 from .config import BotConfig
 from .strategy import compute_signals, choose_raw_tp, apply_tp_decay, should_time_stop, apply_infra_burn, Position, wallet_score, x_score
 
-def backtest_symbol(cfg: BotConfig, df15: pd.DataFrame, df4: pd.DataFrame, symbol: str, bankroll_usd: float = 1000.0):
+BARS_PER_YEAR = 365 * 24 * 4  # 15m bars
+
+class RunStats:
+    """Online performance accumulators, updated once per bar in O(1) without allocating arrays.
+
+    Tracks the running peak and max drawdown (positive fraction) of the bar-close equity,
+    Welford mean/variance of bar returns, bars spent in a position and exits by reason.
+    """
+
+    __slots__ = ("bars", "exposure_bars", "peak", "max_dd", "last", "mean", "m2", "exits")
+
+    def __init__(self, equity: float = 1.0):
+        self.bars = 0
+        self.exposure_bars = 0
+        self.peak = equity
+        self.max_dd = 0.0
+        self.last = equity
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.exits: dict[str, int] = {}
+
+    def update(self, equity: float, in_position: bool):
+        self.bars += 1
+        if in_position:
+            self.exposure_bars += 1
+        r = equity / self.last - 1.0 if self.last > 0 else 0.0
+        self.last = equity
+        d = r - self.mean
+        self.mean += d / self.bars
+        self.m2 += d * (r - self.mean)
+        if equity > self.peak:
+            self.peak = equity
+        elif self.peak > 0 and 1.0 - equity / self.peak > self.max_dd:
+            self.max_dd = 1.0 - equity / self.peak
+
+    def exit(self, reason: str):
+        self.exits[reason] = self.exits.get(reason, 0) + 1
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.bars - 1)) if self.bars > 1 else 0.0
+
+    def sharpe(self, bars_per_year: float = BARS_PER_YEAR) -> float:
+        sd = self.std
+        return self.mean / sd * math.sqrt(bars_per_year) if sd > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {"bars": self.bars, "max_dd": self.max_dd, "ret_mean": self.mean, "ret_std": self.std,
+                "sharpe": self.sharpe(), "exposure": self.exposure_bars / self.bars if self.bars else 0.0,
+                "exits": dict(self.exits)}
+
+def backtest_symbol(cfg: BotConfig, df15: pd.DataFrame, df4: pd.DataFrame, symbol: str, bankroll_usd: float = 1000.0,
+                    stats: RunStats | None = None):
+    """-> (final equity, trades). Pass `stats` to collect drawdown/return/exposure metrics as the loop runs."""
     sig = compute_signals(cfg, df15, df4, symbol)
+    return backtest_signals(cfg, df15.index, df15["close"], sig, symbol, bankroll_usd, stats)
 
+def backtest_signals(cfg: BotConfig, index: pd.DatetimeIndex, close, sig: dict, symbol: str, bankroll_usd: float = 1000.0,
+                     stats: RunStats | None = None, curve: np.ndarray | None = None):
+    """The bar loop of backtest_symbol over precomputed signals aligned with `index`.
+
+    Signals are walked as plain lists and Timestamps are only built while a position is open.
+    If `curve` (len(index) floats) is given, the bar-close equity is written into it.
+    """
     equity = 1.0
     pos: Position | None = None
     trades = []
+    stats = stats if stats is not None else RunStats(equity)
+    # bool() per element like the old .loc lookups (a NaN gate from the 4H ffill counts as open)
+    gates = [bool(g) for g in np.asarray(sig["gate"]).tolist()]
+    stamps = index.tolist()  # one pass; index[i] per bar costs ~20us
+    bars = zip(np.asarray(close, dtype=np.float64).tolist(), np.asarray(sig["trend"], dtype=np.float64).tolist(),
+               gates, np.asarray(sig["entry"], dtype=bool).tolist())
 
-    for ts, row in df15.iterrows():
+    for i, (price, trend, gate, entry) in enumerate(bars):
         # Azure burn every 15m bar
         equity = apply_infra_burn(cfg, equity, hours=0.25)
-
-        price = float(row["close"])
-        trend = float(sig["trend"].loc[ts])
-        gate = bool(sig["gate"].loc[ts])
-        entry = bool(sig["entry"].loc[ts])
         w = wallet_score(symbol)
         x = x_score(symbol)
 
         if pos:
+            ts = stamps[i]
             apply_tp_decay(cfg, pos, ts)
 
             if price >= pos.tp_price:
                 pnl = (pos.tp_price / pos.entry_price - 1.0) - cfg.total_costs
                 equity *= (1 + pnl)
                 trades.append({"symbol":symbol,"entry":pos.entry_time,"exit":ts,"reason":"TP","pnl_pct":pnl})
+                stats.exit("TP")
                 pos = None
-                continue
 
-            if should_time_stop(cfg, pos, ts, w, x):
+            elif should_time_stop(cfg, pos, ts, w, x):
                 pnl = (price / pos.entry_price - 1.0) - cfg.total_costs
                 equity *= (1 + pnl)
                 trades.append({"symbol":symbol,"entry":pos.entry_time,"exit":ts,"reason":"TIME","pnl_pct":pnl})
+                stats.exit("TIME")
                 pos = None
-                continue
 
-        else:
-            if not gate or not entry:
-                continue
+        elif gate and entry:
             raw_tp = choose_raw_tp(cfg, symbol, trend, w, x)
             tp_price = price * (1 + raw_tp + cfg.total_costs)
             notional = bankroll_usd * cfg.max_per_asset_exposure
             if symbol.startswith("DOGE"):
                 notional *= cfg.doge_size_mult
             qty = notional / price
-            pos = Position(symbol=symbol, qty=qty, entry_price=price, entry_time=ts, raw_tp=raw_tp, tp_price=tp_price)
+            pos = Position(symbol=symbol, qty=qty, entry_price=price, entry_time=stamps[i], raw_tp=raw_tp, tp_price=tp_price)
+
+        stats.update(equity, pos is not None)
+        if curve is not None:
+            curve[i] = equity
 
     return equity, pd.DataFrame(trades)
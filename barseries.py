@@ -0,0 +1,144 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+def aggregate_bars(ts: np.ndarray, x: np.ndarray, step_ns: int) -> tuple[np.ndarray, np.ndarray]:
+    """OHLCV rows `x` (5, n) at ascending `ts` -> (bucket start ts, (5, k) bars) for epoch-aligned
+    buckets of `step_ns`. Only non-empty buckets are returned (like resample().dropna())."""
+    if not len(ts):
+        return ts[:0], x[:, :0]
+    bucket = ts // step_ns
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+    agg = np.vstack([x[0, starts], np.maximum.reduceat(x[1], starts), np.minimum.reduceat(x[2], starts),
+                     x[3, ends], np.add.reduceat(x[4], starts)])
+    return bucket[starts] * step_ns, agg
+
+class BarSeries:
+    """Fixed-capacity OHLCV history in one contiguous array.
+
+    Rows live in a (5, capacity + slack) buffer; appends write past the live window
+    and, once the buffer end is reached, the live bars are moved back to the front
+    (one memmove per `slack` appends). The live window is therefore always
+    contiguous, so the column properties and to_frame() are views, not copies.
+    """
+
+    __slots__ = ("capacity", "_ts", "_x", "_start", "_stop")
+
+    def __init__(self, capacity: int, dtype=np.float64):
+        self.capacity = int(capacity)
+        size = self.capacity + max(16, self.capacity // 4)
+        self._ts = np.zeros(size, dtype=np.int64)
+        self._x = np.zeros((len(FIELDS), size), dtype=dtype)
+        self._start = 0
+        self._stop = 0
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getstate__(self):
+        # pickle only the live window (checkpoints)
+        return {"capacity": self.capacity, "dtype": self._x.dtype.str, "ts": self.ts.copy(), "x": self._x[:, self._start:self._stop].copy()}
+
+    def __setstate__(self, st):
+        BarSeries.__init__(self, st["capacity"], np.dtype(st["dtype"]))
+        n = len(st["ts"])
+        self._ts[:n] = st["ts"]
+        self._x[:, :n] = st["x"]
+        self._stop = n
+
+    @property
+    def nbytes(self) -> int:
+        return self._ts.nbytes + self._x.nbytes
+
+    @property
+    def ts(self) -> np.ndarray:
+        return self._ts[self._start:self._stop]
+
+    def _col(self, i: int) -> np.ndarray:
+        return self._x[i, self._start:self._stop]
+
+    open = property(lambda self: self._col(0))
+    high = property(lambda self: self._col(1))
+    low = property(lambda self: self._col(2))
+    close = property(lambda self: self._col(3))
+    volume = property(lambda self: self._col(4))
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._col(FIELDS.index(name))
+
+    @property
+    def last_ts(self) -> pd.Timestamp | None:
+        return pd.Timestamp(int(self._ts[self._stop - 1]), tz="UTC") if len(self) else None
+
+    def _make_room(self, k: int):
+        if self._stop + k <= len(self._ts):
+            return
+        keep = min(len(self), self.capacity - k)
+        src = slice(self._stop - keep, self._stop)
+        self._ts[:keep] = self._ts[src]
+        self._x[:, :keep] = self._x[:, src]
+        self._start, self._stop = 0, keep
+
+    def append(self, ts_ns: int, o: float, h: float, l: float, c: float, v: float):
+        if len(self) and ts_ns <= self._ts[self._stop - 1]:
+            if ts_ns == self._ts[self._stop - 1]:
+                # revised (previously partial) last bar
+                self._x[:, self._stop - 1] = (o, h, l, c, v)
+            return
+        self._make_room(1)
+        self._ts[self._stop] = ts_ns
+        self._x[:, self._stop] = (o, h, l, c, v)
+        self._stop += 1
+        if len(self) > self.capacity:
+            self._start += 1
+
+    def extend(self, ts_ns: np.ndarray, ohlcv: np.ndarray):
+        """Append bars (ts ascending, ohlcv shaped (5, k)). Bars at or before the last stored
+        timestamp overwrite it if equal and are otherwise ignored."""
+        ts_ns = np.asarray(ts_ns, dtype=np.int64)
+        ohlcv = np.asarray(ohlcv)
+        if len(self) and len(ts_ns):
+            last = self._ts[self._stop - 1]
+            eq = np.flatnonzero(ts_ns == last)
+            if len(eq):
+                self._x[:, self._stop - 1] = ohlcv[:, eq[-1]]
+            newer = ts_ns > last
+            ts_ns, ohlcv = ts_ns[newer], ohlcv[:, newer]
+        k = len(ts_ns)
+        if k > self.capacity:
+            ts_ns, ohlcv, k = ts_ns[-self.capacity:], ohlcv[:, -self.capacity:], self.capacity
+        if not k:
+            return
+        self._make_room(k)
+        self._ts[self._stop:self._stop + k] = ts_ns
+        self._x[:, self._stop:self._stop + k] = ohlcv
+        self._stop += k
+        if len(self) > self.capacity:
+            self._start = self._stop - self.capacity
+
+    def extend_frame(self, df: pd.DataFrame):
+        idx = df.index.tz_convert("UTC") if df.index.tz is not None else df.index
+        self.extend(idx.as_unit("ns").asi8, df[list(FIELDS)].to_numpy(dtype=self._x.dtype).T)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, capacity: int | None = None, dtype=np.float64) -> "BarSeries":
+        bs = cls(capacity or max(len(df), 1), dtype)
+        bs.extend_frame(df)
+        return bs
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame over the live window. Column data is shared with the buffer (no copy);
+        don't mutate it, and take a .copy() if it must outlive further appends."""
+        idx = pd.DatetimeIndex(self.ts.view("M8[ns]")).tz_localize("UTC")
+        return pd.DataFrame(self._x[:, self._start:self._stop].T, index=idx, columns=list(FIELDS), copy=False)
+
+    def resample(self, freq: str, capacity: int | None = None) -> "BarSeries":
+        """Aggregate into `freq` buckets aligned to the epoch (same bins as DataFrame.resample for
+        sub-daily frequencies that divide a day); empty buckets are skipped like .dropna()."""
+        bts, agg = aggregate_bars(self.ts, self._x[:, self._start:self._stop], pd.Timedelta(freq).value)
+        out = BarSeries(capacity or max(len(bts), 1), self._x.dtype)
+        out.extend(bts, agg)
+        return out
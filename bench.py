@@ -0,0 +1,346 @@
+"""Benchmarks for hot paths, with a JSON baseline and regression check.
+
+    python -m beastbot.bench --sizes 10000,100000 --update      # record bench_baseline.json
+    python -m beastbot.bench --sizes 10000,100000               # compare; exit 1 on regression
+    python -m beastbot.bench --startup                          # runner cold-import budget
+
+Each bench is timed (best of `--repeat`) and then run once more under tracemalloc
+for peak memory. Benches with a `max_n` skip sizes that would take minutes.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from .config import BotConfig
+from .strategy import Position, compute_signals
+from .panel import compute_signals_panel, stack_panel
+from .state import PositionJournal, save_positions
+from .barseries import BarSeries
+from .robustness import monte_carlo
+from .stream_backtest import write_columnar, backtest_columnar
+from . import indicators, telemetry
+
+BASELINE_PATH = Path("bench_baseline.json")
+
+# entry points that must start fast (crash restarts, short CLI jobs) and deps they must not import eagerly
+STARTUP_MODULES = ("beastbot.runner_live", "beastbot.runner_paper")
+LAZY_MODULES = ("ccxt", "alpaca", "dotenv")
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1000"))
+
+def synthetic_bars(n: int, freq: str = "15min", seed: int = 0, sigma: float = 0.004, drift: float = 0.0,
+                   start: str = "2020-01-01") -> pd.DataFrame:
+    """Random-walk OHLCV; `sigma`/`drift` are per-bar log-return std and mean."""
+    idx = pd.date_range(start, periods=n, freq=freq, tz="UTC")
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(drift, sigma, n)))
+    spread = np.abs(rng.normal(0, 0.002, n))
+    return pd.DataFrame({"open": np.r_[close[0], close[:-1]], "high": close * (1 + spread), "low": close * (1 - spread),
+                         "close": close, "volume": rng.uniform(1, 100, n)}, index=idx)
+
+def _resample_4h(df15: pd.DataFrame) -> pd.DataFrame:
+    return df15.resample("4h").agg({"open":"first","high":"max","low":"min","close":"last","volume":"sum"}).dropna()
+
+def _positions(n: int) -> dict:
+    ts = pd.Timestamp("2025-01-01T00:00:00Z")
+    return {f"S{i}/USD": Position(f"S{i}/USD", 1.0, 100.0, ts, 0.08, 108.5) for i in range(n)}
+
+class MockExchange:
+    """ccxt-shaped exchange that fills every order immediately."""
+
+    def __init__(self):
+        self.ob = {"bids": [[99.99, 10]], "asks": [[100.01, 10]]}
+        self.orders = {}
+
+    def fetch_order_book(self, symbol):
+        return self.ob
+
+    def _order(self, qty, price):
+        oid = str(len(self.orders))
+        self.orders[oid] = {"id": oid, "status": "closed", "filled": qty, "average": price}
+        return self.orders[oid]
+
+    def create_limit_buy_order(self, symbol, qty, price, params=None): return self._order(qty, price)
+    def create_limit_sell_order(self, symbol, qty, price, params=None): return self._order(qty, price)
+    def create_market_buy_order(self, symbol, qty): return self._order(qty, 100.0)
+    def create_market_sell_order(self, symbol, qty): return self._order(qty, 100.0)
+    def fetch_order(self, oid, symbol): return self.orders[oid]
+    def cancel_order(self, oid, symbol): self.orders[oid]["status"] = "canceled"
+
+class _NullSink:
+    # events are still built and serialized, just not printed
+    def write(self, line): pass
+    def flush(self): pass
+    def close(self): pass
+
+# Each bench is (setup(n) -> state, run(state), max_n). Only run() is measured; benches that
+# hold files or handles also have a TEARDOWN entry, called with the state once timing is done.
+
+def _setup_15m(n):
+    df15 = synthetic_bars(n)
+    return df15, _resample_4h(df15)
+
+def _setup_x200(n):
+    syms = tuple(f"S{i}/USD" for i in range(200))
+    cfg = type("Cfg200", (BotConfig,), {"k_band": {s: 2.0 + i / 1000 for i, s in enumerate(syms)}})(symbols=syms)
+    d15 = {s: synthetic_bars(n, seed=i) for i, s in enumerate(syms)}
+    return cfg, d15, {s: _resample_4h(df) for s, df in d15.items()}
+
+def _run_x200(s):
+    cfg, d15, d4 = s
+    for sym in cfg.symbols:
+        compute_signals(cfg, d15[sym], d4[sym], sym)
+
+def _run_panel_x200(s):
+    cfg, d15, d4 = s
+    compute_signals_panel(cfg, stack_panel(d15), stack_panel(d4))
+
+def _setup_broker(n):
+    from .execution_ccxt import RealBroker, ExecConfig
+    from .ratelimit import RequestScheduler
+    cfg = BotConfig()
+    # no limits: measures the broker plus scheduler admission overhead, not the pacing
+    rb = RealBroker(MockExchange(), ExecConfig(cfg.max_spread_pct, cfg.max_slip_pct, 0, 0.0, True), RequestScheduler())
+    return rb, min(n, 2000)
+
+def _run_broker(s):
+    rb, k = s
+    for _ in range(k):
+        qty, _ = rb.buy_notional("SOL/USD", 100.0)
+        rb.sell_qty("SOL/USD", qty)
+
+def _setup_optimize(n):
+    df15, df4 = _setup_15m(max(n, 8000))
+    base = BotConfig()
+    return base, {s: df15 for s in base.symbols}, {s: df4 for s in base.symbols}
+
+def _run_optimize(s):
+    from .optimizer_walkforward import optimize
+    base, d15, d4 = s
+    optimize(base, d15, d4, trials=1, seed=0)
+
+def _run_walk_forward(s):
+    from .optimizer_walkforward import walk_forward
+    base, d15, d4 = s
+    walk_forward(base, d15, d4, trials=1, seed=0, workers=1)
+
+def _setup_state(n):
+    tmp = tempfile.TemporaryDirectory(prefix="beastbot-bench-")
+    paths = dict(state_path=Path(tmp.name) / "state.json", journal_path=Path(tmp.name) / "state.journal")
+    return _positions(min(n, 20000)), paths, tmp
+
+def _setup_journal(n):
+    pos, paths, tmp = _setup_state(n)
+    return PositionJournal(pos, snapshot_every=10**9, **paths), pos["S0/USD"], tmp
+
+def _run_journal(s):
+    j, p, _ = s
+    for _ in range(200):
+        j.update(p)
+
+def _teardown_journal(s):
+    s[0].shutdown()
+    s[2].cleanup()
+
+def _setup_resample(n):
+    from .runner_live import resample_15m_4h
+    return resample_15m_4h, synthetic_bars(n, freq="1h")
+
+def _setup_columnar(n):
+    tmp = tempfile.TemporaryDirectory(prefix="beastbot-bench-")
+    write_columnar(synthetic_bars(n, freq="1min"), tmp.name)
+    return tmp
+
+def _setup_backtest(n):
+    df15, df4 = _setup_15m(n)
+    return BotConfig(), df15, df4
+
+def _run_backtest(s):
+    from .backtest import backtest_symbol
+    cfg, df15, df4 = s
+    backtest_symbol(cfg, df15, df4, "SOL/USD")
+
+BENCHES = {
+    "indicators.ema": (lambda n: synthetic_bars(n)["close"], lambda s: indicators.ema(s, 200), None),
+    "indicators.vwap": (synthetic_bars, lambda df: indicators.vwap(df, 96), None),
+    "indicators.trend_score_4h": (synthetic_bars, indicators.trend_score_4h, None),
+    "indicators.structure_gate": (synthetic_bars, lambda df: indicators.structure_gate(df, 0.08, -0.0015), None),
+    "indicators.entry_signal": (synthetic_bars, lambda df: indicators.entry_signal(df, 96, 96, 2.0), None),
+    "compute_signals": (_setup_15m, lambda s: compute_signals(BotConfig(), s[0], s[1], "SOL/USD"), None),
+    "compute_signals_x200": (_setup_x200, _run_x200, 10_000),
+    "compute_signals_panel_x200": (_setup_x200, _run_panel_x200, 10_000),
+    "resample_15m_4h": (_setup_resample, lambda s: s[0](s[1]), None),
+    "barseries.resample_15m_4h": (lambda n: BarSeries.from_frame(synthetic_bars(n, freq="1h")),
+                                  lambda bs: (bs.resample("15min").to_frame(), bs.resample("4h").to_frame()), None),
+    "backtest_symbol": (_setup_backtest, _run_backtest, 100_000),
+    "optimize_trial": (_setup_optimize, _run_optimize, 10_000),
+    "walk_forward_trial": (_setup_optimize, _run_walk_forward, 10_000),
+    "monte_carlo_10k_paths": (lambda n: np.random.default_rng(0).normal(0.002, 0.03, min(n, 2000)),
+                              lambda pnl: monte_carlo(pnl, 10_000), 10_000),
+    "backtest_columnar_1m": (_setup_columnar, lambda tmp: backtest_columnar(BotConfig(), tmp.name, "SOL/USD", chunk_rows=100_000), 10_000_000),
+    "save_positions": (_setup_state, lambda s: save_positions(s[0], **s[1]), 10_000),
+    "journal_append_x200": (_setup_journal, _run_journal, 10_000),
+    "real_broker_roundtrip": (_setup_broker, _run_broker, 10_000),
+}
+
+TEARDOWN = {
+    "backtest_columnar_1m": lambda tmp: tmp.cleanup(),
+    "save_positions": lambda s: s[2].cleanup(),
+    "journal_append_x200": _teardown_journal,
+}
+
+def _traced(build) -> tuple[int, object]:
+    tracemalloc.start()
+    obj = build()
+    cur, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cur, obj
+
+def symbol_footprint(hours: int = 7 * 24) -> dict:
+    """Bytes held per symbol: the cached 1h history as a DataFrame vs. a BarSeries (float64/float32),
+    and the full per-loop working set (history + df15/df4 + signals) for each."""
+    from .runner_live import resample_15m_4h
+    src = synthetic_bars(hours, freq="1h")
+    cfg = BotConfig()
+
+    def pandas_hist():
+        return src.copy(deep=True)
+
+    def pandas_loop():
+        dfh = src.copy(deep=True)
+        df15, df4 = resample_15m_4h(dfh)
+        return dfh, df15, df4, compute_signals(cfg, df15, df4, "SOL/USD")
+
+    def bs_loop():
+        bs = BarSeries.from_frame(src, capacity=hours)
+        df15, df4 = bs.resample("15min").to_frame(), bs.resample("4h").to_frame()
+        return bs, df15, df4, compute_signals(cfg, df15, df4, "SOL/USD")
+
+    return {
+        "hours": hours,
+        "dataframe_history_bytes": _traced(pandas_hist)[0],
+        "barseries64_history_bytes": _traced(lambda: BarSeries.from_frame(src, capacity=hours))[0],
+        "barseries32_history_bytes": _traced(lambda: BarSeries.from_frame(src, capacity=hours, dtype=np.float32))[0],
+        "dataframe_loop_bytes": _traced(pandas_loop)[0],
+        "barseries_loop_bytes": _traced(bs_loop)[0],
+    }
+
+def import_time(module: str, runs: int = 3) -> tuple[float, list]:
+    """Cold `python -X importtime` cost of `module` in ms (best of `runs` fresh interpreters),
+    plus whichever LAZY_MODULES it pulled in."""
+    root = str(Path(__file__).resolve().parent.parent)
+    code = f"import sys, {module}; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    best = float("inf")
+    eager: list = []
+    for _ in range(runs):
+        p = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=root,
+                           capture_output=True, text=True, check=True)
+        for line in p.stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2].strip() == module:
+                best = min(best, int(parts[1]) / 1000.0)
+        eager = [m for m in p.stdout.strip().split(",") if m]
+    return best, eager
+
+def check_startup(budget_ms: float = STARTUP_BUDGET_MS) -> list:
+    problems = []
+    for mod in STARTUP_MODULES:
+        ms, eager = import_time(mod)
+        print(f"{mod:28s} import {ms:8.1f} ms  (budget {budget_ms:.0f} ms)", file=sys.stderr)
+        if ms > budget_ms:
+            problems.append(f"{mod}: import {ms:.1f} ms > {budget_ms:.0f} ms")
+        if eager:
+            problems.append(f"{mod}: imports {', '.join(eager)} at load")
+    return problems
+
+def run_bench(name: str, n: int, repeat: int = 3) -> dict:
+    setup, fn, _ = BENCHES[name]
+    state = setup(n)
+    try:
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn(state)
+            best = min(best, time.perf_counter() - t0)
+        tracemalloc.start()
+        fn(state)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        teardown = TEARDOWN.get(name)
+        if teardown is not None:
+            teardown(state)
+    return {"sec": best, "peak_mb": peak / 2**20}
+
+def run_all(sizes, names=None, repeat: int = 3) -> dict:
+    results = {}
+    for name in names or BENCHES:
+        max_n = BENCHES[name][2]
+        for n in sizes:
+            if max_n is not None and n > max_n:
+                continue
+            results[f"{name}@{n}"] = r = run_bench(name, n, repeat)
+            print(f"{name:28s} n={n:<9d} {r['sec']*1e3:10.2f} ms  {r['peak_mb']:9.2f} MB", file=sys.stderr)
+    return results
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.25, min_sec: float = 0.001) -> list:
+    """Entries that got slower or bigger than baseline by more than `tolerance` (timings under `min_sec` are noise)."""
+    regressions = []
+    for key, r in results.items():
+        b = baseline.get(key)
+        if b is None:
+            continue
+        if r["sec"] > max(b["sec"], min_sec) * (1 + tolerance):
+            regressions.append(f"{key}: time {b['sec']*1e3:.2f} -> {r['sec']*1e3:.2f} ms")
+        if r["peak_mb"] > max(b["peak_mb"], 0.1) * (1 + tolerance):
+            regressions.append(f"{key}: peak {b['peak_mb']:.2f} -> {r['peak_mb']:.2f} MB")
+    return regressions
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="10000,100000,1000000,10000000")
+    ap.add_argument("--only", default="", help="comma-separated bench names")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--baseline", default=str(BASELINE_PATH))
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    ap.add_argument("--update", action="store_true", help="write results as the new baseline")
+    ap.add_argument("--footprint", action="store_true", help="print per-symbol memory footprint and exit")
+    ap.add_argument("--startup", action="store_true", help="check runner import time against STARTUP_BUDGET_MS and exit")
+    args = ap.parse_args(argv)
+
+    if args.startup:
+        problems = check_startup()
+        for p in problems:
+            print(f"STARTUP {p}", file=sys.stderr)
+        return 1 if problems else 0
+    if args.footprint:
+        for hours in (7 * 24, 30 * 24, 365 * 24):
+            print(json.dumps(symbol_footprint(hours)))
+        return 0
+
+    telemetry.configure([_NullSink()])
+    sizes = [int(s) for s in args.sizes.split(",")]
+    names = [s for s in args.only.split(",") if s] or None
+    results = run_all(sizes, names, args.repeat)
+    path = Path(args.baseline)
+    if args.update or not path.exists():
+        baseline = json.loads(path.read_text()) if path.exists() else {}
+        baseline.update(results)
+        path.write_text(json.dumps(baseline, indent=2, sort_keys=True))
+        print(f"baseline written: {path}", file=sys.stderr)
+        return 0
+    regressions = compare(results, json.loads(path.read_text()), args.tolerance)
+    for r in regressions:
+        print(f"REGRESSION {r}", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
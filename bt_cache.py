@@ -0,0 +1,98 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+import pandas as pd
+
+from .config import BotConfig
+from .state import _write_atomic
+
+CACHE_DIR = Path(".bt_cache")
+
+# Part of every result key. Bump it with any change that alters what a backtest returns for
+# the same config and data: backtest_symbol, the strategy/indicators, scoring, or the result dict.
+ENGINE_VERSION = 1
+
+def _cfg_items(cfg: BotConfig) -> dict:
+    # dataclass fields plus the un-annotated per-symbol dicts (k_band, base_tp, ...), which live on the class
+    out = {}
+    for name in dir(cfg):
+        if name.startswith("_"):
+            continue
+        v = getattr(cfg, name)
+        if not callable(v):
+            out[name] = v
+    return out
+
+def config_fingerprint(cfg: BotConfig) -> str:
+    blob = json.dumps(_cfg_items(cfg), sort_keys=True, separators=(",", ":"), default=repr)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+def data_fingerprint(*frames: pd.DataFrame) -> str:
+    h = hashlib.sha256()
+    for df in frames:
+        h.update(",".join(map(str, df.columns)).encode())
+        h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return h.hexdigest()
+
+def result_key(cfg_fp: str, data_fp: str, **extra) -> str:
+    blob = json.dumps({"engine": ENGINE_VERSION, "cfg": cfg_fp, "data": data_fp, **extra}, sort_keys=True, default=repr)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+class ResultCache:
+    """On-disk content-addressed store of backtest results, evicting least recently used entries past `max_bytes`."""
+
+    def __init__(self, root: Path | str | None = None, max_bytes: int = 512 * 1024 * 1024):
+        self.root = Path(root) if root is not None else CACHE_DIR
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._size = sum(p.stat().st_size for p in self.root.glob("*.pkl"))
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.pkl"
+
+    def get(self, key: str):
+        p = self._path(key)
+        try:
+            value = pickle.loads(p.read_bytes())
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.misses += 1
+            return None
+        os.utime(p)  # recency for eviction
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value):
+        p = self._path(key)
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        old = p.stat().st_size if p.exists() else 0
+        _write_atomic(p, blob)
+        self._size += len(blob) - old
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for p in self.root.glob("*.pkl"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        # trim to 90% so a full cache doesn't rescan the directory on every put
+        target = 0.9 * self.max_bytes
+        for _, size, p in sorted(entries):
+            if total <= target:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            total -= size
+        self._size = total
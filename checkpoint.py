@@ -0,0 +1,45 @@
+from __future__ import annotations
+import pickle
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict
+
+from .barseries import BarSeries
+from .risk import RiskState
+from .state import _write_atomic
+from .telemetry import log
+
+CHECKPOINT_PATH = Path("checkpoint.bin")
+CHECKPOINT_VERSION = 2
+
+@dataclass
+class Checkpoint:
+    """Engine state needed to resume without a cold 7-day refetch.
+
+    Open positions are not duplicated here: the position journal is always at
+    least as fresh. Signals are recomputed from `bars`, which is the only
+    indicator state the strategy carries.
+    """
+    ts: datetime
+    equity: float
+    risk: RiskState
+    bars: Dict[str, BarSeries] = field(default_factory=dict)
+
+def save_checkpoint(ck: Checkpoint, path: Path | None = None):
+    blob = pickle.dumps((CHECKPOINT_VERSION, ck), protocol=pickle.HIGHEST_PROTOCOL)
+    _write_atomic(path or CHECKPOINT_PATH, blob)
+
+def load_checkpoint(path: Path | None = None) -> Checkpoint | None:
+    path = path or CHECKPOINT_PATH
+    if not path.exists():
+        return None
+    try:
+        version, ck = pickle.loads(path.read_bytes())
+    except Exception as e:
+        log({"event": "CHECKPOINT_UNREADABLE", "path": str(path), "err": str(e)})
+        return None
+    if version != CHECKPOINT_VERSION:
+        log({"event": "CHECKPOINT_VERSION", "path": str(path), "version": version})
+        return None
+    return ck
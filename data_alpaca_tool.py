@@ -3,11 +3,13 @@ from __future__ import annotations
 import os
 import re
 from datetime import datetime, timedelta, timezone
-from typing import List, Union
-
-import pandas as pd
+from typing import TYPE_CHECKING, List, Union
 
 from .telemetry import log
+from .ratelimit import DATA, scheduler
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def _parse_timeframe(tf: str):
@@ -41,7 +43,7 @@ def _parse_timeframe(tf: str):
     return TimeFrame(1, TimeFrameUnit.Hour)
 
 
-def fetch_crypto_bars(symbol: Union[str, List[str]], days: int, timeframe: str) -> pd.DataFrame:
+def fetch_crypto_bars(symbol: Union[str, List[str]], days: int, timeframe: str, start: datetime | None = None) -> pd.DataFrame:
     """Fetch crypto OHLCV bars from Alpaca using alpaca-py.
 
     Returns a DataFrame indexed by UTC timestamp with columns:
@@ -50,6 +52,7 @@ def fetch_crypto_bars(symbol: Union[str, List[str]], days: int, timeframe: str)
     Notes:
     - Requires APCA_API_KEY_ID and APCA_API_SECRET_KEY in env/.env.
     - This implementation is for running locally or on your own server.
+    - If `start` is given it overrides `days`, so callers can backfill only missing bars.
     """
 
     api_key = os.getenv("APCA_API_KEY_ID")
@@ -59,12 +62,14 @@ def fetch_crypto_bars(symbol: Union[str, List[str]], days: int, timeframe: str)
             "Missing Alpaca keys. Set APCA_API_KEY_ID and APCA_API_SECRET_KEY in your environment or .env file."
         )
 
+    import pandas as pd
     from alpaca.data.historical import CryptoHistoricalDataClient
     from alpaca.data.requests import CryptoBarsRequest
 
     tf = _parse_timeframe(timeframe)
     end = datetime.now(timezone.utc)
-    start = end - timedelta(days=days)
+    if start is None:
+        start = end - timedelta(days=days)
 
     client = CryptoHistoricalDataClient(api_key, api_secret)
     req = CryptoBarsRequest(
@@ -75,7 +80,7 @@ def fetch_crypto_bars(symbol: Union[str, List[str]], days: int, timeframe: str)
         feed="us",
     )
 
-    resp = client.get_crypto_bars(req)
+    resp = scheduler().call("alpaca", DATA, client.get_crypto_bars, req)
     df = resp.df
     if df is None or df.empty:
         raise RuntimeError(f"No bars returned for {symbol} ({timeframe}, {days}d)")
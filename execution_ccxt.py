@@ -1,9 +1,13 @@
 from __future__ import annotations
 import os, time
 from dataclasses import dataclass
-import ccxt
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # ccxt takes ~0.4s to import; only make_exchange() needs it at runtime
+    import ccxt
 
 from .telemetry import log
+from .ratelimit import RequestScheduler, ORDER, CANCEL, STATUS, scheduler
 
 @dataclass
 class ExecConfig:
@@ -14,6 +18,7 @@ class ExecConfig:
     post_only: bool = True
 
 def make_exchange() -> ccxt.Exchange:
+    import ccxt
     ex_id = os.getenv("EXCHANGE_ID", "coinbase")
     klass = getattr(ccxt, ex_id)
     params = {
@@ -27,12 +32,17 @@ def make_exchange() -> ccxt.Exchange:
     return klass(params)
 
 class RealBroker:
-    def __init__(self, exchange: ccxt.Exchange, cfg: ExecConfig):
+    def __init__(self, exchange: ccxt.Exchange, cfg: ExecConfig, sched: RequestScheduler | None = None):
         self.ex = exchange
         self.cfg = cfg
+        self.sched = sched or scheduler()
+
+    def _req(self, priority: int, fn, *args, **kwargs):
+        # every exchange call shares the process-wide "exchange" budget
+        return self.sched.call("exchange", priority, fn, *args, **kwargs)
 
     def _mid_spread(self, symbol: str):
-        ob = self.ex.fetch_order_book(symbol)
+        ob = self._req(ORDER, self.ex.fetch_order_book, symbol)
         bid = ob["bids"][0][0] if ob["bids"] else None
         ask = ob["asks"][0][0] if ob["asks"] else None
         if bid is None or ask is None:
@@ -55,14 +65,14 @@ class RealBroker:
         limit_price = bid
         params = {"postOnly": self.cfg.post_only} if self.cfg.post_only else {}
         log({"event":"ORDER_SUBMIT","side":"buy","type":"limit","symbol":symbol,"qty":qty,"price":limit_price})
-        order = self.ex.create_limit_buy_order(symbol, qty, limit_price, params=params)
+        order = self._req(ORDER, self.ex.create_limit_buy_order, symbol, qty, limit_price, params=params)
 
         start = time.time()
         filled = 0.0
         cost = 0.0
 
         while True:
-            o = self.ex.fetch_order(order["id"], symbol)
+            o = self._req(STATUS, self.ex.fetch_order, order["id"], symbol)
             f = float(o.get("filled") or 0.0)
             avg = o.get("average") or limit_price
             filled = f
@@ -74,7 +84,7 @@ class RealBroker:
             if time.time() - start >= self.cfg.order_ttl_sec:
                 log({"event":"ORDER_TTL","symbol":symbol,"order_id":order["id"],"filled":filled})
                 try:
-                    self.ex.cancel_order(order["id"], symbol)
+                    self._req(CANCEL, self.ex.cancel_order, order["id"], symbol)
                 except Exception:
                     pass
                 break
@@ -88,10 +98,10 @@ class RealBroker:
             if slip > self.cfg.max_slip_pct[symbol]:
                 raise RuntimeError(f"Slippage too high {slip:.4%} > {self.cfg.max_slip_pct[symbol]:.4%}")
             log({"event":"ORDER_FALLBACK","side":"buy","type":"market","symbol":symbol,"qty":remaining})
-            mo = self.ex.create_market_buy_order(symbol, remaining)
+            mo = self._req(ORDER, self.ex.create_market_buy_order, symbol, remaining)
             # best effort average
             try:
-                mo2 = self.ex.fetch_order(mo["id"], symbol)
+                mo2 = self._req(STATUS, self.ex.fetch_order, mo["id"], symbol)
                 f2 = float(mo2.get("filled") or remaining)
                 a2 = float(mo2.get("average") or mid2)
             except Exception:
@@ -112,14 +122,14 @@ class RealBroker:
         limit_price = ask
         params = {"postOnly": self.cfg.post_only} if self.cfg.post_only else {}
         log({"event":"ORDER_SUBMIT","side":"sell","type":"limit","symbol":symbol,"qty":qty,"price":limit_price})
-        order = self.ex.create_limit_sell_order(symbol, qty, limit_price, params=params)
+        order = self._req(ORDER, self.ex.create_limit_sell_order, symbol, qty, limit_price, params=params)
 
         start = time.time()
         filled = 0.0
         proceeds = 0.0
 
         while True:
-            o = self.ex.fetch_order(order["id"], symbol)
+            o = self._req(STATUS, self.ex.fetch_order, order["id"], symbol)
             f = float(o.get("filled") or 0.0)
             avg = o.get("average") or limit_price
             filled = f
@@ -131,7 +141,7 @@ class RealBroker:
             if time.time() - start >= self.cfg.order_ttl_sec:
                 log({"event":"ORDER_TTL","symbol":symbol,"order_id":order["id"],"filled":filled})
                 try:
-                    self.ex.cancel_order(order["id"], symbol)
+                    self._req(CANCEL, self.ex.cancel_order, order["id"], symbol)
                 except Exception:
                     pass
                 break
@@ -145,9 +155,9 @@ class RealBroker:
             if slip > self.cfg.max_slip_pct[symbol]:
                 raise RuntimeError(f"Slippage too high {slip:.4%} > {self.cfg.max_slip_pct[symbol]:.4%}")
             log({"event":"ORDER_FALLBACK","side":"sell","type":"market","symbol":symbol,"qty":remaining})
-            mo = self.ex.create_market_sell_order(symbol, remaining)
+            mo = self._req(ORDER, self.ex.create_market_sell_order, symbol, remaining)
             try:
-                mo2 = self.ex.fetch_order(mo["id"], symbol)
+                mo2 = self._req(STATUS, self.ex.fetch_order, mo["id"], symbol)
                 f2 = float(mo2.get("filled") or remaining)
                 a2 = float(mo2.get("average") or mid2)
             except Exception:
@@ -34,9 +34,13 @@ def structure_gate(df4: pd.DataFrame, structure_band: float, ema200_slope_block:
     ok = (close > e200) | ((dist <= structure_band) & (slope > ema200_slope_block))
     return ok.fillna(False)
 
-def entry_signal(df15: pd.DataFrame, lookback: int, vwap_lookback: int, k: float) -> pd.Series:
+def entry_band(df15: pd.DataFrame, lookback: int, vwap_lookback: int) -> tuple[pd.Series, pd.Series]:
+    # (vwap, sigma in dollars): the k-independent part of entry_signal
     vw = vwap(df15, vwap_lookback)
     rets = np.log(df15["close"]).diff()
-    sigma_dollars = rets.rolling(lookback).std() * df15["close"]
+    return vw, rets.rolling(lookback).std() * df15["close"]
+
+def entry_signal(df15: pd.DataFrame, lookback: int, vwap_lookback: int, k: float) -> pd.Series:
+    vw, sigma_dollars = entry_band(df15, lookback, vwap_lookback)
     sig = df15["close"] <= (vw - k * sigma_dollars)
     return sig.fillna(False)
@@ -0,0 +1,73 @@
+from __future__ import annotations
+import threading
+
+class Metrics:
+    """In-process counters and gauges rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: dict[tuple, float] = {}
+        self.gauges: dict[tuple, float] = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return (name, tuple(sorted(labels.items())))
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        k = self._key(name, labels)
+        with self._lock:
+            self.counters[k] = self.counters.get(k, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        k = self._key(name, labels)
+        with self._lock:
+            self.gauges[k] = float(value)
+
+    def get(self, name: str, **labels) -> float | None:
+        k = self._key(name, labels)
+        with self._lock:
+            return self.counters.get(k, self.gauges.get(k))
+
+    def render(self) -> str:
+        with self._lock:
+            series = [("counter", k, v) for k, v in self.counters.items()] + [("gauge", k, v) for k, v in self.gauges.items()]
+        lines = []
+        typed = set()
+        for kind, (name, labels), v in sorted(series, key=lambda s: s[1]):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+            lab = ",".join(f'{k}="{str(val)}"' for k, val in labels)
+            lines.append(f"{name}{{{lab}}} {v!r}" if lab else f"{name} {v!r}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Metrics()
+
+def inc(name: str, value: float = 1.0, **labels):
+    REGISTRY.inc(name, value, **labels)
+
+def gauge(name: str, value: float, **labels):
+    REGISTRY.set(name, value, **labels)
+
+def serve(port: int, host: str = "127.0.0.1", registry: Metrics = REGISTRY):
+    """Expose `registry` on http://host:port/metrics from a daemon thread; returns the server."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_response(404); self.end_headers()
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    srv = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=srv.serve_forever, name="metrics", daemon=True).start()
+    return srv
@@ -1,10 +1,15 @@
 from __future__ import annotations
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
-from dataclasses import replace
+from dataclasses import dataclass, replace
 from .config import BotConfig
-from .backtest import backtest_symbol
+from .backtest import backtest_symbol, backtest_signals, RunStats
+from .indicators import trend_score_4h, structure_gate, entry_band
+from .bt_cache import ResultCache, config_fingerprint, data_fingerprint, result_key
+from .robustness import monte_carlo
 
 def max_drawdown(eq: pd.Series) -> float:
     peak = eq.cummax()
@@ -21,6 +26,28 @@ def score_from_trades(final_eq: float, trades: pd.DataFrame) -> float:
     dead = 0.02 if n < 3 else 0.0
     return float(ret - 0.2*churn - dead)
 
+def backtest_result(cfg: BotConfig, df15: pd.DataFrame, df4: pd.DataFrame, symbol: str, bankroll_usd: float,
+                    cache: ResultCache | None = None, data_fp: str | None = None) -> dict:
+    """{"equity", "trades", "score", "stats"} for one backtest, served from `cache` when config and data match.
+    "stats" is RunStats.as_dict(): max_dd, bar-return mean/std/sharpe, exposure and exit counts."""
+    key = None
+    if cache is not None:
+        data_fp = data_fp or data_fingerprint(df15, df4)
+        key = result_key(config_fingerprint(cfg), data_fp, symbol=symbol, bankroll_usd=bankroll_usd)
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+    stats = RunStats()
+    eq, trades = backtest_symbol(cfg, df15, df4, symbol, bankroll_usd=bankroll_usd, stats=stats)
+    res = {"equity": eq, "trades": trades, "score": score_from_trades(eq, trades), "stats": stats.as_dict()}
+    if cache is not None:
+        cache.put(key, res)
+    return res
+
+def evaluate(cfg: BotConfig, df15: pd.DataFrame, df4: pd.DataFrame, symbol: str, bankroll_usd: float,
+             cache: ResultCache | None = None, data_fp: str | None = None) -> float:
+    return backtest_result(cfg, df15, df4, symbol, bankroll_usd, cache, data_fp)["score"]
+
 def make_splits(index: pd.DatetimeIndex, train_days=45, test_days=15, step_days=15):
     idx = index.sort_values()
     cur = idx[0]
@@ -60,17 +87,32 @@ def sample_cfg(base: BotConfig, rng: random.Random) -> BotConfig:
         entry_lookback_15m=base.entry_lookback_15m,
         vwap_lookback_15m=base.vwap_lookback_15m,
         tp_cap=base.tp_cap,
-        tp_decay_at_h=base.tp_decay_at_h,
         tp_decay_mult=base.tp_decay_mult,
-        time_stop_h=base.time_stop_h,
-        time_ext_h=base.time_ext_h,
         trend_permissive=base.trend_permissive,
         wallet_bearish=base.wallet_bearish,
         wallet_supportive=base.wallet_supportive,
         x_boost=base.x_boost,
     )
 
-def optimize(base_cfg: BotConfig, df15_by_sym: dict, df4_by_sym: dict, trials=200, seed=42):
+def sample_trial(base: BotConfig, rng: random.Random) -> BotConfig:
+    """sample_cfg() plus the per-symbol k/tp dicts. Those dicts live on the BotConfig class, so the
+    trial gets its own copies instead of patching the shared ones (which every other trial sees)."""
+    cfg = sample_cfg(base, rng)
+    k, base_tp, boost_tp = dict(cfg.k_band), dict(cfg.base_tp), dict(cfg.boost_tp)
+    k["SOL/USD"] = rng.uniform(1.7, 2.4)
+    k["DOGE/USD"] = rng.uniform(2.0, 2.9)
+    base_tp["SOL/USD"] = rng.uniform(0.05, 0.10)
+    base_tp["DOGE/USD"] = rng.uniform(0.06, 0.14)
+    boost_tp["SOL/USD"] = rng.uniform(max(base_tp["SOL/USD"]+0.03, 0.10), 0.18)
+    boost_tp["DOGE/USD"] = rng.uniform(max(base_tp["DOGE/USD"]+0.04, 0.12), 0.20)
+    for name, d in (("k_band", k), ("base_tp", base_tp), ("boost_tp", boost_tp)):
+        object.__setattr__(cfg, name, d)  # frozen dataclass; these aren't fields
+    return cfg
+
+def optimize(base_cfg: BotConfig, df15_by_sym: dict, df4_by_sym: dict, trials=200, seed=42, cache: ResultCache | None = None,
+             mc_paths: int = 0, mc_dd_penalty: float = 0.5, dd_penalty: float = 0.0):
+    """Random search over sample_cfg(); a trial scores the mean score_from_trades over the test windows,
+    minus `dd_penalty` x mean in-run max drawdown and, with `mc_paths`, `mc_dd_penalty` x bootstrap p95 drawdown."""
     rng = random.Random(seed)
     # common index
     common = None
@@ -81,27 +123,29 @@ def optimize(base_cfg: BotConfig, df15_by_sym: dict, df4_by_sym: dict, trials=20
     if len(splits) < 3:
         raise RuntimeError("Not enough data for walk-forward splits")
 
+    # slice (and fingerprint) each test window once, not once per trial
+    slices = []
+    for _, _, te_s, te_e in splits:
+        for sym in base_cfg.symbols:
+            df15 = df15_by_sym[sym].loc[te_s:te_e]
+            df4  = df4_by_sym[sym].loc[te_s:te_e]
+            slices.append((sym, df15, df4, data_fingerprint(df15, df4) if cache is not None else None))
+
     best_cfg = base_cfg
     best_score = -1e9
 
     for i in range(trials):
-        cfg = sample_cfg(base_cfg, rng)
-        # patch k + tp dicts
-        cfg.k_band["SOL/USD"] = rng.uniform(1.7, 2.4)
-        cfg.k_band["DOGE/USD"] = rng.uniform(2.0, 2.9)
-        cfg.base_tp["SOL/USD"] = rng.uniform(0.05, 0.10)
-        cfg.base_tp["DOGE/USD"] = rng.uniform(0.06, 0.14)
-        cfg.boost_tp["SOL/USD"] = rng.uniform(max(cfg.base_tp["SOL/USD"]+0.03, 0.10), 0.18)
-        cfg.boost_tp["DOGE/USD"] = rng.uniform(max(cfg.base_tp["DOGE/USD"]+0.04, 0.12), 0.20)
-
-        scores = []
-        for _, _, te_s, te_e in splits:
-            for sym in base_cfg.symbols:
-                df15 = df15_by_sym[sym].loc[te_s:te_e]
-                df4  = df4_by_sym[sym].loc[te_s:te_e]
-                eq, trades = backtest_symbol(cfg, df15, df4, sym, bankroll_usd=base_cfg.bankroll_usd)
-                scores.append(score_from_trades(eq, trades))
-        sc = float(np.mean(scores)) if scores else -1e9
+        cfg = sample_trial(base_cfg, rng)
+
+        results = [backtest_result(cfg, df15, df4, sym, base_cfg.bankroll_usd, cache, fp) for sym, df15, df4, fp in slices]
+        sc = float(np.mean([r["score"] for r in results])) if results else -1e9
+        if dd_penalty and results:
+            sc -= dd_penalty * float(np.mean([r["stats"]["max_dd"] for r in results]))
+        if mc_paths and results:
+            # bootstrap the pooled trades; penalize configs whose bad-tail drawdown is large
+            pnl = [r["trades"]["pnl_pct"].to_numpy() for r in results if len(r["trades"])]
+            mc = monte_carlo(np.concatenate(pnl) if pnl else np.zeros(0), mc_paths, seed=seed + i)
+            sc -= mc_dd_penalty * mc["dd_p95"]
         if sc > best_score:
             best_score = sc
             best_cfg = cfg
@@ -110,3 +154,112 @@ def optimize(base_cfg: BotConfig, df15_by_sym: dict, df4_by_sym: dict, trials=20
                   f"tp_sol={cfg.base_tp['SOL/USD']:.2f}/{cfg.boost_tp['SOL/USD']:.2f} "
                   f"tp_doge={cfg.base_tp['DOGE/USD']:.2f}/{cfg.boost_tp['DOGE/USD']:.2f}")
     return best_cfg
+
+def _features(cfg: BotConfig, df15: pd.DataFrame, df4: pd.DataFrame, rows: np.ndarray) -> dict:
+    # signal inputs that no sampled knob changes (sample_cfg keeps the lookbacks and gate params of base),
+    # computed once over the symbol's full history and taken at the common bars `rows`
+    t = trend_score_4h(df4).reindex(df15.index, method="ffill")
+    g = structure_gate(df4, cfg.structure_band, cfg.ema200_slope_block).reindex(df15.index, method="ffill")
+    vw, sigma = entry_band(df15, cfg.entry_lookback_15m, cfg.vwap_lookback_15m)
+    return {"close": df15["close"].to_numpy(dtype=np.float64)[rows], "trend": t.to_numpy(dtype=np.float64)[rows],
+            "gate": g.to_numpy()[rows], "vw": vw.to_numpy(dtype=np.float64)[rows], "sigma": sigma.to_numpy(dtype=np.float64)[rows]}
+
+def _run_window(cfg: BotConfig, index: pd.DatetimeIndex, f: dict, symbol: str, bankroll_usd: float, curve=None):
+    with np.errstate(invalid="ignore"):
+        entry = f["close"] <= f["vw"] - cfg.k_band[symbol] * f["sigma"]
+    sig = {"trend": f["trend"], "gate": f["gate"], "entry": entry}
+    stats = RunStats()
+    eq, trades = backtest_signals(cfg, index, f["close"], sig, symbol, bankroll_usd, stats, curve)
+    return eq, trades, stats
+
+def _window_score(eq: float, trades: pd.DataFrame, stats: RunStats, dd_penalty: float) -> float:
+    return score_from_trades(eq, trades) - dd_penalty * stats.max_dd
+
+def _fit_split(task) -> dict:
+    # one walk-forward split: random search on train, then only the winner on test
+    candidates, feats, index, train, test, bankroll_usd, dd_penalty = task
+    syms = list(feats)
+    tr = slice(*index.searchsorted(list(train)))
+    te = slice(*index.searchsorted(list(test)))
+
+    best_cfg, best_sc = None, -np.inf
+    for cfg in candidates:
+        scores = [_window_score(*_run_window(cfg, index[tr], {k: v[tr] for k, v in feats[s].items()}, s, bankroll_usd), dd_penalty)
+                  for s in syms]
+        sc = float(np.mean(scores))
+        if sc > best_sc:
+            best_cfg, best_sc = cfg, sc
+
+    curves = np.empty((len(syms), te.stop - te.start))
+    test_sc, stats = [], {}
+    for j, s in enumerate(syms):
+        eq, trades, st = _run_window(best_cfg, index[te], {k: v[te] for k, v in feats[s].items()}, s, bankroll_usd, curves[j])
+        test_sc.append(_window_score(eq, trades, st, dd_penalty))
+        stats[s] = st.as_dict()
+    return {"train": train, "test": test, "cfg": best_cfg, "train_score": best_sc, "test_score": float(np.mean(test_sc)),
+            "test_stats": stats, "index": index[te], "curve": curves.mean(axis=0)}
+
+@dataclass
+class WalkForwardResult:
+    equity: pd.Series  # stitched out-of-sample equity, equal-weight across symbols
+    splits: list       # per split: train/test bounds, winning cfg, train/test score, test RunStats
+
+    @property
+    def total_return(self) -> float:
+        return float(self.equity.iloc[-1] - 1.0) if len(self.equity) else 0.0
+
+    @property
+    def max_drawdown(self) -> float:
+        return max_drawdown(self.equity)
+
+def walk_forward(base_cfg: BotConfig, df15_by_sym: dict, df4_by_sym: dict, trials: int = 50, seed: int = 42,
+                 train_days: int = 45, test_days: int = 15, step_days: int = 15, workers: int | None = None,
+                 dd_penalty: float = 0.0, bankroll_usd: float | None = None) -> WalkForwardResult:
+    """Fit on each train window, score the winner on the following test window, stitch the test windows.
+
+    Features are computed once per symbol over the full history (so windows start warmed up, as the
+    live bot does) and shared by every split and trial; only the k-band comparison depends on the
+    trial. The same `trials` candidates are searched in every split, and splits run in parallel
+    processes (`workers`, default cpu count; 1 runs inline).
+    """
+    bankroll_usd = base_cfg.bankroll_usd if bankroll_usd is None else bankroll_usd
+    common = None
+    for sym in base_cfg.symbols:
+        idx = df15_by_sym[sym].index
+        common = idx if common is None else common.intersection(idx)
+    splits = make_splits(common, train_days, test_days, step_days)
+    if not splits:
+        raise RuntimeError("Not enough data for walk-forward splits")
+
+    feats = {s: _features(base_cfg, df15_by_sym[s], df4_by_sym[s], df15_by_sym[s].index.get_indexer(common))
+             for s in base_cfg.symbols}
+    rng = random.Random(seed)
+    candidates = [sample_trial(base_cfg, rng) for _ in range(trials)]
+
+    tasks = []
+    prev_end = None
+    for tr_s, tr_e, te_s, te_e in splits:
+        # overlapping test windows (step < test) only contribute bars not already covered
+        te_s = max(te_s, prev_end) if prev_end is not None else te_s
+        prev_end = te_e
+        lo, hi = common.searchsorted([tr_s, te_e])
+        tasks.append((candidates, {s: {k: v[lo:hi] for k, v in f.items()} for s, f in feats.items()},
+                      common[lo:hi], (tr_s, tr_e), (te_s, te_e), bankroll_usd, dd_penalty))
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_fit_split, tasks))
+    else:
+        results = [_fit_split(t) for t in tasks]
+
+    level, parts = 1.0, []
+    for r in results:
+        parts.append(pd.Series(level * r["curve"], index=r["index"]))
+        if len(r["curve"]):
+            level *= r["curve"][-1]
+        cfg = r["cfg"]
+        print(f"[wf] test {r['test'][0]:%Y-%m-%d}..{r['test'][1]:%Y-%m-%d} train={r['train_score']:.6f} "
+              f"test={r['test_score']:.6f} k_sol={cfg.k_band['SOL/USD']:.2f} k_doge={cfg.k_band['DOGE/USD']:.2f}")
+        del r["curve"], r["index"]
+    return WalkForwardResult(pd.concat(parts) if parts else pd.Series(dtype=float), results)
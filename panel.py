@@ -0,0 +1,168 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import reduce
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .barseries import FIELDS
+from .config import BotConfig
+
+@dataclass
+class Panel:
+    """OHLCV for many symbols on one time index: panel["close"] is a (time, symbol) matrix."""
+    index: pd.DatetimeIndex
+    symbols: list
+    x: np.ndarray  # (field, time, symbol)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.x[FIELDS.index(name)]
+
+def _ohlcv(df: pd.DataFrame) -> np.ndarray:
+    cols = list(FIELDS)
+    return (df if list(df.columns) == cols else df[cols]).to_numpy(dtype=np.float64)
+
+def stack_panel(frames: dict[str, pd.DataFrame]) -> Panel:
+    """Stack per-symbol OHLCV frames. Indexes that differ are outer-joined; missing bars are NaN."""
+    syms = list(frames)
+    idx = frames[syms[0]].index
+    if not all(df.index.equals(idx) for df in frames.values()):
+        idx = reduce(lambda a, b: a.union(b), (df.index for df in frames.values()))
+        frames = {s: df.reindex(idx) for s, df in frames.items()}
+    x = np.stack([_ohlcv(frames[s]) for s in syms], axis=2)  # (time, field, symbol)
+    return Panel(idx, syms, np.ascontiguousarray(x.transpose(1, 0, 2)))
+
+# Kernels run along axis 0 (time) for all columns at once.
+
+def ema(x: np.ndarray, span: int) -> np.ndarray:
+    # the recursion of ewm(span, adjust=False).mean() (ignore_na=False), one row at a time, so
+    # results are bit-identical to indicators.ema per column
+    a = 2.0 / (span + 1.0)
+    out = np.empty_like(x, dtype=np.float64)
+    if not len(x):
+        return out
+    w = x[0].astype(np.float64)
+    old = np.ones_like(w)
+    out[0] = w
+    for i in range(1, len(x)):
+        c = x[i]
+        obs = c == c
+        has = w == w
+        old = np.where(has, old * (1.0 - a), old)
+        upd = has & obs & (w != c)
+        w = np.where(upd, (old * w + a * c) / (old + a), w)
+        old = np.where(has & obs, 1.0, old)
+        w = np.where(~has & obs, c, w)
+        out[i] = w
+    return out
+
+def shift(x: np.ndarray, n: int) -> np.ndarray:
+    out = np.full_like(x, np.nan, dtype=np.float64)
+    out[n:] = x[:-n]
+    return out
+
+def _window_sums(x: np.ndarray, n: int) -> np.ndarray:
+    # sums of the trailing n rows (rows n-1..), NaN where a window holds a NaN (min_periods=n)
+    c = np.zeros((len(x) + 1,) + x.shape[1:])
+    nan = np.isnan(x)
+    if not nan.any():
+        np.cumsum(x, axis=0, out=c[1:])
+        return c[n:] - c[:-n]
+    np.cumsum(np.where(nan, 0.0, x), axis=0, out=c[1:])
+    k = np.zeros(c.shape, dtype=np.int64)
+    np.cumsum(nan, axis=0, out=k[1:])
+    s = c[n:] - c[:-n]
+    s[k[n:] != k[:-n]] = np.nan
+    return s
+
+def rolling_sum(x: np.ndarray, n: int) -> np.ndarray:
+    """rolling(n).sum() via cumulative sums; equal to pandas up to float rounding."""
+    out = np.full_like(x, np.nan, dtype=np.float64)
+    if len(x) >= n:
+        out[n - 1:] = _window_sums(x, n)
+    return out
+
+def rolling_std(x: np.ndarray, n: int) -> np.ndarray:
+    """rolling(n).std() (ddof=1); columns are centered first to keep the sum of squares well-conditioned."""
+    out = np.full_like(x, np.nan, dtype=np.float64)
+    if len(x) < n or n < 2:
+        return out
+    with np.errstate(all="ignore"):
+        xc = x - np.nanmean(x, axis=0)
+    s1 = _window_sums(xc, n)
+    var = (_window_sums(xc * xc, n) - s1 * s1 / n) / (n - 1)
+    out[n - 1:] = np.sqrt(np.maximum(var, 0.0, where=~np.isnan(var), out=var))
+    return out
+
+def _rolling_reduce(x: np.ndarray, n: int, fn) -> np.ndarray:
+    out = np.full_like(x, np.nan, dtype=np.float64)
+    if len(x) >= n:
+        out[n - 1:] = fn(sliding_window_view(x, n, axis=0), axis=-1)
+    return out
+
+def rolling_max(x: np.ndarray, n: int) -> np.ndarray:
+    return _rolling_reduce(x, n, np.max)
+
+def rolling_min(x: np.ndarray, n: int) -> np.ndarray:
+    return _rolling_reduce(x, n, np.min)
+
+def vwap(p: Panel, lookback: int) -> np.ndarray:
+    tp = (p["high"] + p["low"] + p["close"]) / 3.0
+    return rolling_sum(tp * p["volume"], lookback) / rolling_sum(p["volume"], lookback)
+
+def _slope(e200: np.ndarray) -> np.ndarray:
+    ago = shift(e200, 20)
+    return (e200 - ago) / ago
+
+def trend_score_4h(p4: Panel, e200: np.ndarray | None = None) -> np.ndarray:
+    close = p4["close"]
+    e50 = ema(close, 50)
+    e200 = ema(close, 200) if e200 is None else e200
+    slope = _slope(e200)
+    spread = (e50 - e200) / e200
+    hh = (close - rolling_max(close, 20)) / close
+    ll = (close - rolling_min(close, 20)) / close
+
+    def clip(x, d): return np.clip(x / d, -1, 1)
+    return np.clip(0.35*clip(spread, 0.05) + 0.30*clip(slope, 0.05) + 0.20*clip(-hh, 0.05) + 0.15*clip(ll, 0.05), -1, 1)
+
+def structure_gate(p4: Panel, structure_band: float, ema200_slope_block: float, e200: np.ndarray | None = None) -> np.ndarray:
+    close = p4["close"]
+    e200 = ema(close, 200) if e200 is None else e200
+    slope = _slope(e200)
+    dist = np.abs(close - e200) / e200
+    with np.errstate(invalid="ignore"):
+        return (close > e200) | ((dist <= structure_band) & (slope > ema200_slope_block))
+
+def entry_signal(p15: Panel, lookback: int, vwap_lookback: int, k: np.ndarray) -> np.ndarray:
+    close = p15["close"]
+    vw = vwap(p15, vwap_lookback)
+    rets = np.diff(np.log(close), axis=0, prepend=np.nan)
+    sigma_dollars = rolling_std(rets, lookback) * close
+    with np.errstate(invalid="ignore"):
+        return close <= vw - k * sigma_dollars
+
+def compute_signals_panel(cfg: BotConfig, p15: Panel, p4: Panel) -> dict:
+    """compute_signals for every symbol of the panels at once; values are (time x symbol) frames.
+
+    Column `sym` matches compute_signals(cfg, df15, df4, sym) when the symbols share one bar
+    index (rolling windows count rows, so outer-joined gaps shift them); trend and gate are
+    exact, entry agrees up to float rounding at the band edge.
+    """
+    if list(p4.symbols) != list(p15.symbols):
+        raise ValueError("p15 and p4 must hold the same symbols in the same order")
+    k = np.array([cfg.k_band[s] for s in p15.symbols])
+    e200 = ema(p4["close"], 200)  # shared by trend and gate
+    # 4H values apply to the 15m bars up to the next 4H bar (reindex(method="ffill"))
+    at = p4.index.get_indexer(p15.index, method="ffill")
+    before = at < 0
+    t = trend_score_4h(p4, e200)[at]
+    t[before] = np.nan
+    g = structure_gate(p4, cfg.structure_band, cfg.ema200_slope_block, e200)[at]
+    g[before] = False
+    e = entry_signal(p15, cfg.entry_lookback_15m, cfg.vwap_lookback_15m, k)
+    frame = lambda a: pd.DataFrame(a, index=p15.index, columns=p15.symbols, copy=False)
+    return {"trend": frame(t), "gate": frame(g), "entry": frame(e)}
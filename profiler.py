@@ -0,0 +1,116 @@
+from __future__ import annotations
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from . import metrics
+from .telemetry import log
+
+class _Span:
+    __slots__ = ("prof", "name", "t0")
+
+    def __init__(self, prof: "StageProfiler", name: str):
+        self.prof = prof
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.prof.record(self.name, time.perf_counter_ns() - self.t0)
+        return False
+
+class StageProfiler:
+    """Per-stage wall-time samples over a rolling window; percentiles are only computed on summary()."""
+
+    def __init__(self, window: int = 2048, enabled: bool = True):
+        self.window = window
+        self.enabled = enabled
+        self.samples: dict[str, deque] = {}
+        self.counts: Counter = Counter()
+        self.sampler: SamplingProfiler | None = None
+        self._last_emit = time.monotonic()
+
+    def span(self, name: str):
+        return _Span(self, name) if self.enabled else _NOOP
+
+    def record(self, name: str, elapsed_ns: int):
+        d = self.samples.get(name)
+        if d is None:
+            d = self.samples[name] = deque(maxlen=self.window)
+        d.append(elapsed_ns)
+        self.counts[name] += 1
+
+    def summary(self) -> dict:
+        out = {}
+        for name, d in list(self.samples.items()):
+            xs = sorted(d)
+            if not xs:
+                continue
+            n = len(xs)
+            def pct(q): return xs[min(n - 1, int(q * n))] / 1e6
+            out[name] = {"n": self.counts[name], "p50_ms": pct(0.50), "p95_ms": pct(0.95),
+                         "p99_ms": pct(0.99), "max_ms": xs[-1] / 1e6}
+        return out
+
+    def maybe_emit(self, interval_sec: float = 300.0):
+        """Log a STAGE_SUMMARY event (and stage gauges) at most once per `interval_sec`."""
+        now = time.monotonic()
+        if now - self._last_emit < interval_sec:
+            return
+        self._last_emit = now
+        stages = self.summary()
+        for name, s in stages.items():
+            for q in ("p50", "p95", "p99"):
+                metrics.gauge("beastbot_stage_ms", s[f"{q}_ms"], stage=name, quantile=q)
+        ev = {"event": "STAGE_SUMMARY", "stages": stages}
+        if self.sampler is not None:
+            ev["hot"] = self.sampler.top(10)
+        log(ev)
+
+class _NoopSpan:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NOOP = _NoopSpan()
+
+class SamplingProfiler:
+    """Optional statistical profiler: samples one thread's stack every `interval_sec` from a daemon thread."""
+
+    def __init__(self, interval_sec: float = 0.01, thread_id: int | None = None, depth: int = 1):
+        self.interval_sec = interval_sec
+        self.thread_id = thread_id or threading.get_ident()
+        self.depth = depth
+        self.hits: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_sec):
+            frame = sys._current_frames().get(self.thread_id)
+            key = []
+            while frame is not None and len(key) < self.depth:
+                co = frame.f_code
+                key.append(f"{co.co_filename.rsplit('/', 1)[-1]}:{co.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if key:
+                self.hits[" < ".join(key)] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def top(self, n: int = 20) -> list:
+        return self.hits.most_common(n)
+
+PROFILER = StageProfiler()
+span = PROFILER.span
@@ -0,0 +1,154 @@
+from __future__ import annotations
+import heapq
+import itertools
+import os
+import threading
+import time
+
+from . import metrics
+from .telemetry import log
+
+# priority classes: lower is served first
+ORDER, CANCEL, STATUS, DATA = 0, 1, 2, 3
+PRIORITY_NAMES = ("order", "cancel", "status", "data")
+
+# fraction of an endpoint's burst that a class must leave in the bucket, so a data
+# backfill or a polling loop can never spend the tokens an order is about to need
+RESERVE = (0.0, 0.0, 0.2, 0.5)
+
+# requests/sec, burst; override with RATE_LIMITS="alpaca=3:10,exchange=5:10"
+DEFAULT_LIMITS = {"alpaca": (3.0, 10), "exchange": (5.0, 10)}
+
+class RateLimited(RuntimeError):
+    pass
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "stamp")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def wait_time(self, need: float, now: float) -> float:
+        self.refill(now)
+        return max(0.0, (need - self.tokens) / self.rate)
+
+def _is_rate_limited(e: Exception) -> bool:
+    # ccxt: RateLimitExceeded / DDoSProtection; alpaca-py APIError carries status_code
+    return (type(e).__name__ in ("RateLimitExceeded", "DDoSProtection")
+            or getattr(e, "status_code", None) == 429)
+
+class RequestScheduler:
+    """Per-endpoint token buckets shared by every API client in the process.
+
+    acquire() blocks until the endpoint has a token for the caller's priority class;
+    waiters are admitted in (priority, arrival) order. Endpoints without a configured
+    limit pass straight through. When `max_waiting` callers are already queued on an
+    endpoint, DATA requests are rejected with RateLimited instead of piling up; orders,
+    cancels and status polls always queue, since they run in the middle of an order
+    and dropping one can leave a live order behind on the exchange.
+    """
+
+    def __init__(self, limits: dict | None = None, max_waiting: int = 32, retries: int = 2, backoff_sec: float = 1.0):
+        self.max_waiting = max_waiting
+        self.retries = retries
+        self.backoff_sec = backoff_sec
+        self._cv = threading.Condition()
+        self._buckets = {ep: TokenBucket(r, b) for ep, (r, b) in (limits or {}).items()}
+        self._waiting: dict[str, list] = {}
+        self._seq = itertools.count()
+
+    def set_limit(self, endpoint: str, rate: float, burst: float):
+        with self._cv:
+            self._buckets[endpoint] = TokenBucket(rate, burst)
+            self._cv.notify_all()
+
+    def acquire(self, endpoint: str, priority: int = DATA, timeout: float | None = None):
+        name = PRIORITY_NAMES[priority]
+        b = self._buckets.get(endpoint)
+        if b is None:
+            metrics.inc("beastbot_requests_total", endpoint=endpoint, priority=name)
+            return
+        t0 = time.monotonic()
+        with self._cv:
+            q = self._waiting.setdefault(endpoint, [])
+            if priority == DATA and len(q) >= self.max_waiting:
+                metrics.inc("beastbot_requests_rejected_total", endpoint=endpoint, priority=name)
+                raise RateLimited(f"{endpoint}: {len(q)} requests queued, shedding {name}")
+            me = (priority, next(self._seq))
+            heapq.heappush(q, me)
+            metrics.gauge("beastbot_request_queue", len(q), endpoint=endpoint)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None
+                    if q[0] == me:
+                        wait = b.wait_time(min(b.burst, 1.0 + RESERVE[priority] * b.burst), now)
+                        if wait <= 0:
+                            b.tokens -= 1.0
+                            break
+                    if timeout is not None:
+                        left = t0 + timeout - now
+                        if left <= 0 or (wait is not None and wait > left):
+                            metrics.inc("beastbot_requests_rejected_total", endpoint=endpoint, priority=name)
+                            raise RateLimited(f"{endpoint}: no token for {name} within {timeout}s")
+                        wait = left if wait is None else wait
+                    self._cv.wait(wait)
+            finally:
+                q.remove(me)
+                heapq.heapify(q)
+                metrics.gauge("beastbot_request_queue", len(q), endpoint=endpoint)
+                self._cv.notify_all()
+        metrics.inc("beastbot_requests_total", endpoint=endpoint, priority=name)
+        metrics.inc("beastbot_request_wait_seconds_total", time.monotonic() - t0, endpoint=endpoint, priority=name)
+
+    def penalize(self, endpoint: str, sec: float):
+        """Server said slow down: empty the bucket so the whole endpoint pauses for `sec`."""
+        with self._cv:
+            b = self._buckets.get(endpoint)
+            if b is not None:
+                b.refill(time.monotonic())
+                b.tokens = min(b.tokens, 0.0) - sec * b.rate
+
+    def call(self, endpoint: str, priority: int, fn, *args, **kwargs):
+        """fn(*args, **kwargs) once a token is granted; 429s back the endpoint off and retry."""
+        for attempt in range(self.retries + 1):
+            self.acquire(endpoint, priority)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.retries or not _is_rate_limited(e):
+                    raise
+                metrics.inc("beastbot_requests_throttled_total", endpoint=endpoint)
+                log({"event": "RATE_LIMITED", "endpoint": endpoint, "priority": PRIORITY_NAMES[priority], "attempt": attempt + 1})
+                self.penalize(endpoint, self.backoff_sec * 2 ** attempt)
+
+def limits_from_env() -> dict:
+    limits = dict(DEFAULT_LIMITS)
+    for part in filter(None, os.getenv("RATE_LIMITS", "").split(",")):
+        ep, spec = part.split("=")
+        rate, _, burst = spec.partition(":")
+        limits[ep.strip()] = (float(rate), float(burst or rate))
+    return limits
+
+_scheduler: RequestScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+def scheduler() -> RequestScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler(limits_from_env())
+        return _scheduler
+
+def configure(sched: RequestScheduler | None):
+    """Install the process-wide scheduler (None: rebuild from env on next use)."""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = sched
@@ -44,6 +44,15 @@ def check_breakers(rs: RiskState, equity: float, max_daily_dd: float, max_weekly
         rs.halted = True
         rs.reason = f"CONSEC_LOSSES {rs.consec_losses} >= {max_consec_losses}"
 
+def mark_to_market(equity: float, positions: dict, prices: dict, total_costs: float) -> float:
+    # book each open position as if closed at `prices`, the same way the runners book real exits
+    for sym, pos in positions.items():
+        px = prices.get(sym)
+        if px is None:
+            continue
+        equity *= 1 + (px / pos.entry_price - 1.0) - total_costs
+    return equity
+
 def on_trade_close(rs: RiskState, pnl_pct: float):
     if pnl_pct < 0:
         rs.consec_losses += 1
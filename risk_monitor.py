@@ -0,0 +1,81 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Callable, Dict
+
+from .config import BotConfig
+from .risk import RiskState, check_breakers, mark_to_market
+from .telemetry import log, alert
+from . import metrics
+
+class RiskMonitor:
+    """Marks open positions to market every `interval_sec` and runs the breakers on live equity.
+
+    Runs beside the once-a-minute signal loop. `equity_fn` returns realized equity,
+    `fetch_quotes(symbols)` returns {symbol: price}; prices older than
+    `max_quote_age_sec` are not used. When a breaker trips here, `on_halt(reason)`
+    is called immediately (e.g. to flatten) instead of waiting for the next strategy pass.
+    """
+
+    def __init__(self, cfg: BotConfig, rs: RiskState, positions: Dict, equity_fn: Callable[[], float],
+                 fetch_quotes: Callable[[list], Dict[str, float]], on_halt: Callable[[str], None] | None = None,
+                 interval_sec: float = 1.0, max_quote_age_sec: float = 10.0):
+        self.cfg = cfg
+        self.rs = rs
+        self.positions = positions
+        self.equity_fn = equity_fn
+        self.fetch_quotes = fetch_quotes
+        self.on_halt = on_halt
+        self.interval_sec = interval_sec
+        self.max_quote_age_sec = max_quote_age_sec
+        self.quotes: Dict[str, tuple[float, float]] = {}
+        self.live_equity = 1.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _refresh_quotes(self, symbols: list):
+        try:
+            fresh = self.fetch_quotes(symbols)
+        except Exception as e:
+            log({"event": "QUOTE_ERROR", "err": str(e)})
+            return
+        t = time.monotonic()
+        for sym, px in fresh.items():
+            if px:
+                self.quotes[sym] = (float(px), t)
+
+    def tick(self) -> float:
+        symbols = list(self.positions)
+        if symbols:
+            self._refresh_quotes(symbols)
+        cutoff = time.monotonic() - self.max_quote_age_sec
+        prices = {s: px for s, (px, t) in self.quotes.items() if t >= cutoff}
+        eq = mark_to_market(self.equity_fn(), dict(self.positions), prices, self.cfg.total_costs)
+        self.live_equity = eq
+        metrics.gauge("beastbot_mtm_equity", eq)
+
+        if not self.rs.halted:
+            check_breakers(self.rs, eq, self.cfg.max_daily_dd_pct, self.cfg.max_weekly_dd_pct, self.cfg.max_consec_losses)
+            if self.rs.halted:
+                log({"event": "RISK_HALT", "reason": self.rs.reason, "mtm_equity": eq, "open": symbols})
+                alert(f"RISK_HALT {self.rs.reason} mtm_equity={eq:.4f}")
+                if self.on_halt is not None:
+                    self.on_halt(self.rs.reason)
+        return eq
+
+    def _run(self):
+        while not self._stop.wait(self.interval_sec):
+            try:
+                self.tick()
+            except Exception as e:
+                log({"event": "RISK_MONITOR_ERROR", "err": str(e)})
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="risk-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+def _pnl(trades: pd.DataFrame | np.ndarray) -> np.ndarray:
+    if isinstance(trades, pd.DataFrame):
+        return trades["pnl_pct"].to_numpy(dtype=np.float64) if len(trades) else np.zeros(0)
+    return np.asarray(trades, dtype=np.float64)
+
+def resample_trades(pnl: np.ndarray, n_paths: int = 10_000, method: str = "block", block: int = 5,
+                    seed: int | None = 0) -> np.ndarray:
+    """(n_paths, n_trades) matrix of per-trade returns.
+
+    "block": circular block bootstrap (keeps short runs of wins/losses together).
+    "shuffle": permutes the realized trades per path; final return is unchanged,
+    only the ordering (and so the drawdown) varies.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(pnl)
+    if method == "shuffle":
+        return rng.permuted(np.broadcast_to(pnl, (n_paths, n)), axis=1)
+    if method != "block":
+        raise ValueError(f"unknown method {method!r}")
+    block = max(1, min(block, n))
+    n_blocks = -(-n // block)
+    # wrap-around without a modulo: blocks index into pnl extended by its first `block` trades
+    ext = np.concatenate([pnl, pnl[:block]])
+    starts = rng.integers(0, n, size=(n_paths, n_blocks), dtype=np.int32)
+    idx = starts[:, :, None] + np.arange(block, dtype=np.int32)
+    return ext.take(idx.reshape(n_paths, -1)[:, :n])
+
+def equity_paths(rets: np.ndarray) -> np.ndarray:
+    return np.cumprod(1.0 + rets, axis=-1)
+
+def max_drawdown_paths(eq: np.ndarray) -> np.ndarray:
+    """Vectorized max_drawdown over the last axis (as a positive fraction); paths start at equity 1.0."""
+    if not eq.shape[-1]:
+        return np.zeros(eq.shape[:-1])
+    ratio = np.maximum.accumulate(eq, axis=-1)
+    np.maximum(ratio, 1.0, out=ratio)
+    np.divide(eq, ratio, out=ratio)
+    return 1.0 - ratio.min(axis=-1)
+
+def monte_carlo(trades: pd.DataFrame | np.ndarray, n_paths: int = 10_000, method: str = "block", block: int = 5,
+                seed: int | None = 0, quantiles=(0.05, 0.50, 0.95)) -> dict:
+    """Return and drawdown distributions of resampled trade sequences."""
+    pnl = _pnl(trades)
+    if len(pnl) == 0:
+        out = {"n_trades": 0, "n_paths": n_paths, "prob_loss": 0.0}
+        for q in quantiles:
+            out[f"ret_p{int(q * 100):02d}"] = 0.0
+            out[f"dd_p{int(q * 100):02d}"] = 0.0
+        return out
+    eq = resample_trades(pnl, n_paths, method, block, seed)
+    eq += 1.0
+    np.cumprod(eq, axis=-1, out=eq)
+    ret = eq[:, -1] - 1.0
+    dd = max_drawdown_paths(eq)
+    out = {"n_trades": len(pnl), "n_paths": n_paths, "prob_loss": float((ret < 0).mean()),
+           "ret_mean": float(ret.mean()), "dd_mean": float(dd.mean())}
+    rq = np.quantile(ret, quantiles)
+    dq = np.quantile(dd, quantiles)
+    for q, r, d in zip(quantiles, rq, dq):
+        out[f"ret_p{int(q * 100):02d}"] = float(r)
+        out[f"dd_p{int(q * 100):02d}"] = float(d)
+    return out
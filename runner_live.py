@@ -1,57 +1,152 @@
 from __future__ import annotations
-from dotenv import load_dotenv
+import os
+import threading
 import time
 import pandas as pd
 from datetime import datetime, timezone
 
 from .config import BotConfig
-from .telemetry import log, alert
+from .telemetry import log, alert, configure_from_env
+from . import metrics
+from .profiler import PROFILER, SamplingProfiler, span
 from .watchdog import CrashGuard
+from .supervisor import STANDBY_ENV, beat, wait_for_activation
+from .risk_monitor import RiskMonitor
 from .risk import RiskState, update_period_starts, check_breakers, on_trade_close
 from .strategy import compute_signals, choose_raw_tp, apply_tp_decay, should_time_stop, apply_infra_burn, Position, wallet_score, x_score
-from .state import load_positions, save_positions
+from .state import PositionJournal
+from .checkpoint import Checkpoint, load_checkpoint, save_checkpoint
+from .barseries import BarSeries
 from .execution_ccxt import make_exchange, RealBroker, ExecConfig
+from .ratelimit import STATUS, scheduler
 from .data_alpaca_tool import fetch_crypto_bars
 
 def resample_15m_4h(df: pd.DataFrame):
     df15 = df.resample("15min").agg({"open":"first","high":"max","low":"min","close":"last","volume":"sum"}).dropna()
-    df4  = df.resample("4H").agg({"open":"first","high":"max","low":"min","close":"last","volume":"sum"}).dropna()
+    df4  = df.resample("4h").agg({"open":"first","high":"max","low":"min","close":"last","volume":"sum"}).dropna()
     return df15, df4
 
+HISTORY_BARS = 7 * 24  # 1h bars kept per symbol
+
 def run():
+    from dotenv import load_dotenv
     load_dotenv()
+    standby = bool(os.getenv(STANDBY_ENV))
+    if not standby:
+        configure_from_env()
     cfg = BotConfig()
     ex = make_exchange()
     broker = RealBroker(ex, ExecConfig(cfg.max_spread_pct, cfg.max_slip_pct, cfg.order_ttl_sec, cfg.poll_interval_sec, cfg.post_only))
 
-    rs = RiskState()
     guard = CrashGuard()
 
-    positions = load_positions()
-    equity = 1.0
+    if standby:
+        # hot standby: pay for imports, exchange setup and markets now; state is read only once promoted,
+        # since the active worker keeps changing it until then. The log file and METRICS_PORT are the
+        # active worker's too, so sinks stay on stdout until promotion.
+        ex.load_markets()
+        log({"event":"STANDBY_READY","pid":os.getpid()})
+        if not wait_for_activation():
+            return
+        configure_from_env()
+        log({"event":"STANDBY_ACTIVE","pid":os.getpid()})
+
+    journal = PositionJournal.load()
+    positions = journal.positions
+
+    # warm restart: keep drawdown tracking and cached bars instead of starting cold
+    ck = load_checkpoint()
+    rs = ck.risk if ck else RiskState()
+    equity = ck.equity if ck else 1.0
+    bars = ck.bars if ck else {}
+    if ck:
+        log({"event":"RESUME","checkpoint_ts":ck.ts,"equity":equity,"halted":rs.halted})
+
+    if os.getenv("PROFILE_SAMPLE_MS"):
+        PROFILER.sampler = SamplingProfiler(float(os.getenv("PROFILE_SAMPLE_MS")) / 1000.0).start()
+
+    # exits/entries from this loop and flattening from the risk monitor are serialized on this lock
+    lock = threading.RLock()
+
+    def close_position(sym: str, reason: str, ts) -> float | None:
+        nonlocal equity
+        with lock:
+            pos = positions.get(sym)
+            if pos is None:
+                return None
+            with span("broker.sell_qty"):
+                filled_qty, avg = broker.sell_qty(sym, pos.qty)
+            pnl = (avg / pos.entry_price - 1.0) - cfg.total_costs
+            equity *= (1 + pnl)
+            on_trade_close(rs, pnl)
+            log({"t": ts, "event":f"EXIT_{reason}", "sym":sym, "avg":avg, "pnl_pct":pnl, "equity":equity})
+            with span("journal"):
+                journal.close(sym)
+            # realized PnL and consec_losses can't wait for the end of the loop pass: an exception
+            # later in the pass drops `dirty`, and a restart would resume with the old equity
+            with span("save_checkpoint"):
+                save_checkpoint(Checkpoint(datetime.now(timezone.utc), equity, rs, dict(bars)))
+            return pnl
+
+    def flatten(reason: str):
+        now = datetime.now(timezone.utc)
+        for sym in list(positions):
+            try:
+                close_position(sym, "FLATTEN", now)
+            except Exception as e:
+                log({"event":"FLATTEN_ERROR","sym":sym,"err":str(e)})
+        # under the lock: the main loop extends these BarSeries and saves checkpoints too
+        with lock:
+            save_checkpoint(Checkpoint(now, equity, rs, dict(bars)))
+
+    def fetch_quotes(symbols: list) -> dict:
+        # bid is what a flatten would sell into
+        return {s: scheduler().call("exchange", STATUS, ex.fetch_ticker, s).get("bid") for s in symbols}
+
+    RiskMonitor(cfg, rs, positions, lambda: equity, fetch_quotes, on_halt=flatten,
+                interval_sec=float(os.getenv("RISK_MONITOR_SEC", "1.0"))).start()
 
     while True:
         try:
+            beat()
             now = datetime.now(timezone.utc)
             update_period_starts(rs, now, equity)
             check_breakers(rs, equity, cfg.max_daily_dd_pct, cfg.max_weekly_dd_pct, cfg.max_consec_losses)
 
             # infra burn per 15m tick
-            equity = apply_infra_burn(cfg, equity, hours=0.25)
+            with lock:
+                equity = apply_infra_burn(cfg, equity, hours=0.25)
 
             if rs.halted:
                 log({"event":"HALTED","reason":rs.reason,"equity":equity})
+                metrics.gauge("beastbot_equity", equity)
+                metrics.gauge("beastbot_halted", 1)
                 time.sleep(60)
                 continue
 
+            dirty = False
+            loop_t0 = time.perf_counter_ns()
             for sym in cfg.symbols:
-                # fetch recent bars (1Hour) and resample
-                dfh = fetch_crypto_bars(sym, days=7, timeframe="1Hour")
-                df15, df4 = resample_15m_4h(dfh)
+                bs = bars.get(sym)
+                if bs is None:
+                    with lock:
+                        bs = bars[sym] = BarSeries(HISTORY_BARS)
+                # fetch only bars missing from the cache (last cached bar is refetched, it may have been partial)
+                last = bs.last_ts
+                with span("fetch_crypto_bars"):
+                    fresh = fetch_crypto_bars(sym, days=7, timeframe="1Hour", start=last.to_pydatetime() if last is not None else None)
+                with lock:
+                    bs.extend_frame(fresh)
+                if bs.last_ts != last:
+                    dirty = True
+                with span("resample_15m_4h"):
+                    df15 = bs.resample("15min").to_frame()
+                    df4 = bs.resample("4h").to_frame()
                 if len(df15) < 150 or len(df4) < 80:
                     continue
 
-                sig = compute_signals(cfg, df15, df4, sym)
+                with span("compute_signals"):
+                    sig = compute_signals(cfg, df15, df4, sym)
                 ts = df15.index[-1]
                 price = float(df15["close"].iloc[-1])
                 trend = float(sig["trend"].iloc[-1])
@@ -61,28 +156,28 @@ def run():
 
                 if sym in positions:
                     pos = positions[sym]
+                    before = (pos.raw_tp, pos.tp_price, pos.extended)
                     apply_tp_decay(cfg, pos, ts)
 
                     # TP exit
                     if price >= pos.tp_price:
-                        filled_qty, avg = broker.sell_qty(sym, pos.qty)
-                        pnl = (avg / pos.entry_price - 1.0) - cfg.total_costs
-                        equity *= (1 + pnl)
-                        on_trade_close(rs, pnl)
-                        log({"t": ts, "event":"EXIT_TP", "sym":sym, "avg":avg, "pnl_pct":pnl, "equity":equity})
-                        del positions[sym]; save_positions(positions)
+                        if close_position(sym, "TP", ts) is not None:
+                            dirty = True
                         continue
 
                     # Time exit
                     if should_time_stop(cfg, pos, ts, w, x):
-                        filled_qty, avg = broker.sell_qty(sym, pos.qty)
-                        pnl = (avg / pos.entry_price - 1.0) - cfg.total_costs
-                        equity *= (1 + pnl)
-                        on_trade_close(rs, pnl)
-                        log({"t": ts, "event":"EXIT_TIME", "sym":sym, "avg":avg, "pnl_pct":pnl, "equity":equity})
-                        del positions[sym]; save_positions(positions)
+                        if close_position(sym, "TIME", ts) is not None:
+                            dirty = True
                         continue
 
+                    # decayed TP / time-stop extension must survive a restart
+                    if (pos.raw_tp, pos.tp_price, pos.extended) != before:
+                        with lock:
+                            if positions.get(sym) is pos:
+                                with span("journal"):
+                                    journal.update(pos)
+
                 else:
                     if not gate or not entry:
                         continue
@@ -94,14 +189,30 @@ def run():
 
                     raw_tp = choose_raw_tp(cfg, sym, trend, w, x)
 
-                    filled_qty, avg = broker.buy_notional(sym, notional)
-                    tp_price = avg * (1 + raw_tp + cfg.total_costs)
+                    with lock:
+                        # the risk monitor may have halted since the top of the loop
+                        if rs.halted:
+                            continue
+                        with span("broker.buy_notional"):
+                            filled_qty, avg = broker.buy_notional(sym, notional)
+                        tp_price = avg * (1 + raw_tp + cfg.total_costs)
 
-                    positions[sym] = Position(sym, filled_qty, avg, ts, raw_tp, tp_price)
-                    save_positions(positions)
+                        with span("journal"):
+                            journal.open(Position(sym, filled_qty, avg, ts, raw_tp, tp_price))
                     log({"t": ts, "event":"ENTRY", "sym":sym, "avg":avg, "qty":filled_qty,
                          "raw_tp":raw_tp, "tp_price":tp_price, "trend":trend, "equity":equity})
 
+            metrics.gauge("beastbot_equity", equity)
+            metrics.gauge("beastbot_open_positions", len(positions))
+            metrics.gauge("beastbot_halted", 0)
+
+            if dirty:
+                with span("save_checkpoint"), lock:
+                    save_checkpoint(Checkpoint(now, equity, rs, bars))
+
+            PROFILER.record("loop", time.perf_counter_ns() - loop_t0)
+            PROFILER.maybe_emit()
+
             # loop every minute, signals based on latest 15m bar anyway
             time.sleep(60)
 
@@ -1,13 +1,13 @@
 from __future__ import annotations
-from dotenv import load_dotenv
 import pandas as pd
 
 from .config import BotConfig
 from .data_alpaca_tool import fetch_crypto_bars
-from .telemetry import log
+from .telemetry import log, configure_from_env
 from .risk import RiskState, update_period_starts, check_breakers, on_trade_close
 from .strategy import compute_signals, choose_raw_tp, apply_tp_decay, should_time_stop, apply_infra_burn, Position, wallet_score, x_score
-from .state import load_positions, save_positions
+from .state import PositionJournal
+from .panel import stack_panel, compute_signals_panel
 from datetime import datetime, timezone
 
 def resample_15m_4h(df: pd.DataFrame):
@@ -16,11 +16,14 @@ def resample_15m_4h(df: pd.DataFrame):
     return df15, df4
 
 def run(days: int = 30):
+    from dotenv import load_dotenv
     load_dotenv()
+    configure_from_env()
     cfg = BotConfig()
     rs = RiskState()
     equity = 1.0
-    positions = load_positions()
+    journal = PositionJournal.load()
+    positions = journal.positions
 
     data = {}
     sigs = {}
@@ -30,7 +33,16 @@ def run(days: int = 30):
         dfh = fetch_crypto_bars(sym, days=days, timeframe="1Hour")
         df15, df4 = resample_15m_4h(dfh)
         data[sym] = (df15, df4)
-        sigs[sym] = compute_signals(cfg, df15, df4, sym)
+
+    idx15, idx4 = data[cfg.symbols[0]][0].index, data[cfg.symbols[0]][1].index
+    if all(d15.index.equals(idx15) and d4.index.equals(idx4) for d15, d4 in data.values()):
+        panel = compute_signals_panel(cfg, stack_panel({s: d[0] for s, d in data.items()}),
+                                      stack_panel({s: d[1] for s, d in data.items()}))
+        sigs = {sym: {k: v[sym] for k, v in panel.items()} for sym in cfg.symbols}
+    else:
+        # ragged histories: rolling windows have to run over each symbol's own bars
+        for sym in cfg.symbols:
+            sigs[sym] = compute_signals(cfg, data[sym][0], data[sym][1], sym)
 
     common = None
     for sym in cfg.symbols:
@@ -62,6 +74,7 @@ def run(days: int = 30):
 
             if sym in positions:
                 pos = positions[sym]
+                before = (pos.raw_tp, pos.tp_price, pos.extended)
                 apply_tp_decay(cfg, pos, ts)
 
                 if price >= pos.tp_price:
@@ -69,7 +82,7 @@ def run(days: int = 30):
                     equity *= (1 + pnl)
                     on_trade_close(rs, pnl)
                     log({"t": ts, "event":"EXIT_TP", "sym":sym, "pnl_pct":pnl, "equity":equity})
-                    del positions[sym]; save_positions(positions)
+                    journal.close(sym)
                     continue
 
                 if should_time_stop(cfg, pos, ts, w, x):
@@ -77,9 +90,12 @@ def run(days: int = 30):
                     equity *= (1 + pnl)
                     on_trade_close(rs, pnl)
                     log({"t": ts, "event":"EXIT_TIME", "sym":sym, "pnl_pct":pnl, "equity":equity})
-                    del positions[sym]; save_positions(positions)
+                    journal.close(sym)
                     continue
 
+                if (pos.raw_tp, pos.tp_price, pos.extended) != before:
+                    journal.update(pos)
+
             else:
                 if not gate or not entry:
                     continue
@@ -89,11 +105,11 @@ def run(days: int = 30):
                 qty = notional / price
                 raw_tp = choose_raw_tp(cfg, sym, trend, w, x)
                 tp_price = price * (1 + raw_tp + cfg.total_costs)
-                positions[sym] = Position(sym, qty, price, ts, raw_tp, tp_price)
-                save_positions(positions)
+                journal.open(Position(sym, qty, price, ts, raw_tp, tp_price))
                 log({"t": ts, "event":"ENTRY", "sym":sym, "price":price, "qty":qty,
                      "raw_tp":raw_tp, "tp_price":tp_price, "trend":trend, "equity":equity})
 
+    journal.shutdown()
     log({"event":"DONE", "equity":equity, "open_positions": list(positions.keys())})
 
 if __name__ == "__main__":
@@ -1,21 +1,130 @@
 from __future__ import annotations
 import json
+import os
+import tempfile
 from pathlib import Path
 from dataclasses import asdict
 from typing import Dict
 from .strategy import Position
 
 STATE_PATH = Path("state.json")
+JOURNAL_PATH = Path("state.journal")
 
-def load_positions() -> Dict[str, Position]:
-    if not STATE_PATH.exists():
-        return {}
-    raw = json.loads(STATE_PATH.read_text())
+def _dumps(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), default=str)
+
+def _write_atomic(path: Path, data: str | bytes):
+    # temp file + fsync + rename: readers see the old snapshot or the new one, never half of either.
+    # The temp name is unique so concurrent writers can't truncate each other's file.
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    try:
+        fd = os.open(str(path.parent), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _replay(out: Dict[str, Position], journal_path: Path):
+    if not journal_path.exists():
+        return
+    with open(journal_path) as f:
+        for line in f:
+            try:
+                ev = json.loads(line)
+            except ValueError:
+                # torn tail from a crash mid-append; everything before it is intact
+                break
+            if ev["op"] == "close":
+                out.pop(ev["sym"], None)
+            else:
+                out[ev["sym"]] = Position(**ev["pos"])
+
+def load_positions(state_path: Path | None = None, journal_path: Path | None = None) -> Dict[str, Position]:
+    state_path = state_path or STATE_PATH
+    journal_path = journal_path or JOURNAL_PATH
     out = {}
-    for sym, d in raw.items():
-        out[sym] = Position(**d)
+    if state_path.exists():
+        raw = json.loads(state_path.read_text())
+        for sym, d in raw.items():
+            out[sym] = Position(**d)
+    _replay(out, journal_path)
     return out
 
-def save_positions(pos: Dict[str, Position]):
+def save_positions(pos: Dict[str, Position], state_path: Path | None = None, journal_path: Path | None = None):
+    state_path = state_path or STATE_PATH
+    journal_path = journal_path or JOURNAL_PATH
     raw = {sym: asdict(p) for sym, p in pos.items()}
-    STATE_PATH.write_text(json.dumps(raw, indent=2, default=str))
+    _write_atomic(state_path, _dumps(raw))
+    # the snapshot now covers every journaled event
+    if journal_path.exists():
+        open(journal_path, "w").close()
+
+class PositionJournal:
+    """Append-only log of position events on top of the state.json snapshot.
+
+    open/update/close append one line each; every `snapshot_every` events the
+    live positions are compacted into a fresh snapshot and the journal is reset.
+    """
+
+    def __init__(self, positions: Dict[str, Position] | None = None, snapshot_every: int = 500,
+                 fsync: bool = True, state_path: Path | None = None, journal_path: Path | None = None):
+        self.positions = positions if positions is not None else {}
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.state_path = state_path or STATE_PATH
+        self.journal_path = journal_path or JOURNAL_PATH
+        self.pending = 0
+        self._f = open(self.journal_path, "a")
+
+    @classmethod
+    def load(cls, **kwargs) -> "PositionJournal":
+        positions = load_positions(kwargs.get("state_path"), kwargs.get("journal_path"))
+        # compact before appending: a torn tail left in the journal would swallow the next
+        # event, and replay stops at the first bad line, so everything after it would be lost
+        save_positions(positions, kwargs.get("state_path"), kwargs.get("journal_path"))
+        return cls(positions, **kwargs)
+
+    def _append(self, ev: dict):
+        self._f.write(_dumps(ev) + "\n")
+        self._f.flush()
+        if self.fsync:
+            os.fsync(self._f.fileno())
+        self.pending += 1
+        if self.pending >= self.snapshot_every:
+            self.snapshot()
+
+    def open(self, pos: Position):
+        self.positions[pos.symbol] = pos
+        self._append({"op": "open", "sym": pos.symbol, "pos": asdict(pos)})
+
+    def update(self, pos: Position):
+        self.positions[pos.symbol] = pos
+        self._append({"op": "update", "sym": pos.symbol, "pos": asdict(pos)})
+
+    def close(self, symbol: str):
+        self.positions.pop(symbol, None)
+        self._append({"op": "close", "sym": symbol})
+
+    def snapshot(self):
+        save_positions(self.positions, self.state_path, self.journal_path)
+        self.pending = 0
+
+    def shutdown(self):
+        self.snapshot()
+        self._f.close()
@@ -0,0 +1,198 @@
+from __future__ import annotations
+import math
+from collections import deque
+from pathlib import Path
+from typing import Iterator
+import numpy as np
+import pandas as pd
+
+from .backtest import RunStats
+from .barseries import FIELDS, aggregate_bars
+from .config import BotConfig
+from .strategy import choose_raw_tp, apply_tp_decay, should_time_stop, apply_infra_burn, Position, wallet_score, x_score
+
+STEP_15M = pd.Timedelta("15min").value
+STEP_4H = pd.Timedelta("4h").value
+
+def write_columnar(df: pd.DataFrame, root: Path | str):
+    """Store 1m OHLCV as one .npy per column (ts as int64 ns) so it can be memory-mapped."""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    idx = df.index.tz_convert("UTC") if df.index.tz is not None else df.index
+    np.save(root / "ts.npy", idx.as_unit("ns").asi8)
+    for col in FIELDS:
+        np.save(root / f"{col}.npy", df[col].to_numpy(dtype=np.float64))
+
+def iter_columnar(root: Path | str, chunk_rows: int = 1_000_000) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Yield (ts, ohlcv (5, k)) chunks from memory-mapped columns; only one chunk is resident at a time."""
+    root = Path(root)
+    ts = np.load(root / "ts.npy", mmap_mode="r")
+    cols = [np.load(root / f"{c}.npy", mmap_mode="r") for c in FIELDS]
+    for s in range(0, len(ts), chunk_rows):
+        e = min(s + chunk_rows, len(ts))
+        yield np.array(ts[s:e]), np.vstack([c[s:e] for c in cols])
+
+class _Ema:
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = math.nan
+
+    def update(self, x: float) -> float:
+        # ewm(adjust=False): seeded with the first value
+        self.value = x if math.isnan(self.value) else self.value + self.alpha * (x - self.value)
+        return self.value
+
+def _clip(x: float, d: float) -> float:
+    return x if math.isnan(x) else min(1.0, max(-1.0, x / d))
+
+class StreamingBacktest:
+    """backtest_symbol over 1m bars fed in chunks, with O(lookback) memory.
+
+    15m and 4H bars are built incrementally; a 15m bucket is emitted once a later
+    minute arrives (or on finish()). Indicator state is rolling: EMAs, and fixed
+    windows for VWAP, return std, the 20-bar high/low and the EMA200 slope.
+    Signals follow compute_signals' alignment: the 4H value labeled at a bucket's
+    start applies to every 15m bar in that bucket, so the 15m bars of a 4H bucket
+    (at most 16) are held until the bucket closes. Position, equity and open
+    buckets carry across chunk boundaries.
+    """
+
+    def __init__(self, cfg: BotConfig, symbol: str, bankroll_usd: float = 1000.0, stats: RunStats | None = None):
+        self.cfg = cfg
+        self.symbol = symbol
+        self.bankroll_usd = bankroll_usd
+        self.k = cfg.k_band[symbol]
+        self.equity = 1.0
+        self.pos: Position | None = None
+        self.trades: list = []
+        self.stats = stats if stats is not None else RunStats(self.equity)
+        self.bars_15m = 0
+
+        self._carry_ts = np.zeros(0, dtype=np.int64)
+        self._carry_x = np.zeros((5, 0))
+        self._pending: list = []  # 15m bars of the open 4H bucket
+        self._bucket_4h = None
+
+        # 15m entry state
+        self._pv = deque(maxlen=cfg.vwap_lookback_15m)
+        self._vol = deque(maxlen=cfg.vwap_lookback_15m)
+        self._rets = deque(maxlen=cfg.entry_lookback_15m)
+        self._last_log_close = math.nan
+
+        # 4H structure/trend state
+        self._e50 = _Ema(50)
+        self._e200 = _Ema(200)
+        self._e200_hist = deque(maxlen=21)
+        self._close_20 = deque(maxlen=20)
+        self._trend = math.nan
+        self._gate = False
+
+    def feed(self, ts: np.ndarray, x: np.ndarray):
+        if len(self._carry_ts):
+            ts = np.concatenate([self._carry_ts, ts])
+            x = np.hstack([self._carry_x, x])
+        if not len(ts):
+            return
+        # the last 15m bucket may continue in the next chunk: keep its minutes back
+        cut = np.searchsorted(ts, (ts[-1] // STEP_15M) * STEP_15M)
+        self._carry_ts, self._carry_x = ts[cut:], x[:, cut:]
+        self._emit_15m(ts[:cut], x[:, :cut])
+
+    def finish(self) -> tuple[float, pd.DataFrame]:
+        self._emit_15m(self._carry_ts, self._carry_x)
+        self._carry_ts, self._carry_x = self._carry_ts[:0], self._carry_x[:, :0]
+        self._close_4h()
+        return self.equity, pd.DataFrame(self.trades)
+
+    def _emit_15m(self, ts: np.ndarray, x: np.ndarray):
+        bts, agg = aggregate_bars(ts, x, STEP_15M)
+        for i, t in enumerate(bts.tolist()):
+            b4 = t // STEP_4H
+            if b4 != self._bucket_4h and self._pending:
+                self._close_4h()
+            self._bucket_4h = b4
+            self._pending.append((t, agg[0, i], agg[1, i], agg[2, i], agg[3, i], agg[4, i]))
+
+    def _close_4h(self):
+        bars = self._pending
+        if not bars:
+            return
+        close = bars[-1][4]
+        e50 = self._e50.update(close)
+        e200 = self._e200.update(close)
+        self._e200_hist.append(e200)
+        self._close_20.append(close)
+
+        e200_ago = self._e200_hist[0] if len(self._e200_hist) == 21 else math.nan
+        slope = (e200 - e200_ago) / e200_ago
+        if len(self._close_20) == 20:
+            hh = (close - max(self._close_20)) / close
+            ll = (close - min(self._close_20)) / close
+        else:
+            hh = ll = math.nan
+        t = 0.35 * _clip((e50 - e200) / e200, 0.05) + 0.30 * _clip(slope, 0.05) + 0.20 * _clip(-hh, 0.05) + 0.15 * _clip(ll, 0.05)
+        self._trend = t if math.isnan(t) else min(1.0, max(-1.0, t))
+        dist = abs(close - e200) / e200
+        self._gate = (close > e200) or (dist <= self.cfg.structure_band and slope > self.cfg.ema200_slope_block)
+
+        self._pending = []
+        for bar in bars:
+            self._on_bar(*bar)
+
+    def _entry(self, h: float, l: float, c: float, v: float) -> bool:
+        self._pv.append((h + l + c) / 3.0 * v)
+        self._vol.append(v)
+        lc = math.log(c)
+        if not math.isnan(self._last_log_close):
+            self._rets.append(lc - self._last_log_close)
+        self._last_log_close = lc
+        if len(self._pv) < self._pv.maxlen or len(self._rets) < self._rets.maxlen:
+            return False
+        vw = math.fsum(self._pv) / math.fsum(self._vol)
+        sigma = float(np.std(self._rets, ddof=1))
+        return c <= vw - self.k * sigma * c
+
+    def _on_bar(self, t: int, o: float, h: float, l: float, c: float, v: float):
+        cfg = self.cfg
+        sym = self.symbol
+        self.bars_15m += 1
+        self.equity = apply_infra_burn(cfg, self.equity, hours=0.25)
+        entry = self._entry(h, l, c, v)
+        w = wallet_score(sym)
+        x = x_score(sym)
+        pos = self.pos
+
+        if pos:
+            ts = pd.Timestamp(t, tz="UTC")
+            apply_tp_decay(cfg, pos, ts)
+            if c >= pos.tp_price:
+                pnl = (pos.tp_price / pos.entry_price - 1.0) - cfg.total_costs
+                self.equity *= (1 + pnl)
+                self.trades.append({"symbol":sym,"entry":pos.entry_time,"exit":ts,"reason":"TP","pnl_pct":pnl})
+                self.stats.exit("TP")
+                self.pos = None
+            elif should_time_stop(cfg, pos, ts, w, x):
+                pnl = (c / pos.entry_price - 1.0) - cfg.total_costs
+                self.equity *= (1 + pnl)
+                self.trades.append({"symbol":sym,"entry":pos.entry_time,"exit":ts,"reason":"TIME","pnl_pct":pnl})
+                self.stats.exit("TIME")
+                self.pos = None
+        elif self._gate and entry:
+            raw_tp = choose_raw_tp(cfg, sym, self._trend, w, x)
+            tp_price = c * (1 + raw_tp + cfg.total_costs)
+            notional = self.bankroll_usd * cfg.max_per_asset_exposure
+            if sym.startswith("DOGE"):
+                notional *= cfg.doge_size_mult
+            self.pos = Position(symbol=sym, qty=notional / c, entry_price=c, entry_time=pd.Timestamp(t, tz="UTC"),
+                                raw_tp=raw_tp, tp_price=tp_price)
+        self.stats.update(self.equity, self.pos is not None)
+
+def backtest_columnar(cfg: BotConfig, root: Path | str, symbol: str, chunk_rows: int = 1_000_000,
+                      bankroll_usd: float = 1000.0, stats: RunStats | None = None) -> tuple[float, pd.DataFrame]:
+    """Streaming backtest over a write_columnar() directory of 1m bars; same outputs as backtest_symbol."""
+    bt = StreamingBacktest(cfg, symbol, bankroll_usd, stats)
+    for ts, x in iter_columnar(root, chunk_rows):
+        bt.feed(ts, x)
+    return bt.finish()
@@ -0,0 +1,160 @@
+"""Run runner_live as a child process and replace it when it stalls.
+
+    python -m beastbot.supervisor [--standby] [--stall-sec 300]
+
+The worker writes HEARTBEAT_PATH every loop. A worker whose heartbeat is older than
+`stall_sec` (a hung HTTP call never raises, so CrashGuard can't see it) or that has
+exited is killed and replaced. With --standby a second worker is kept pre-warmed:
+imported, exchange built and markets loaded, blocked on stdin. Failover hands it one
+line and it starts trading from the journal and checkpoint right away.
+"""
+from __future__ import annotations
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+from .telemetry import log, alert
+
+HEARTBEAT_PATH = Path(os.getenv("HEARTBEAT_PATH", "heartbeat"))
+STANDBY_ENV = "BEASTBOT_STANDBY"
+
+def beat(path: Path | None = None):
+    """Called by the worker once per loop; atomic so the supervisor never reads half a write."""
+    path = Path(path or HEARTBEAT_PATH)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(f"{os.getpid()} {time.time():.3f}\n")
+    os.replace(tmp, path)
+
+def wait_for_activation() -> bool:
+    """Standby workers block here until the supervisor promotes them; False if it went away."""
+    return bool(sys.stdin.readline())
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+class Supervisor:
+    def __init__(self, cmd: list | None = None, heartbeat_path: Path | None = None, stall_sec: float = 300.0,
+                 startup_grace_sec: float = 180.0, standby: bool = False, max_restarts: int = 5,
+                 window_sec: float = 1800.0):
+        self.cmd = cmd or [sys.executable, "-m", "beastbot.run_live"]
+        self.heartbeat_path = Path(heartbeat_path or HEARTBEAT_PATH)
+        self.stall_sec = stall_sec
+        self.startup_grace_sec = startup_grace_sec
+        self.standby = standby
+        self.max_restarts = max_restarts
+        self.window_sec = window_sec
+        self.worker: subprocess.Popen | None = None
+        self.spare: subprocess.Popen | None = None
+        self.restarts: deque = deque()
+        self._started = 0.0
+
+    def _spawn(self, standby: bool) -> subprocess.Popen:
+        env = dict(os.environ, HEARTBEAT_PATH=str(self.heartbeat_path))
+        env.pop(STANDBY_ENV, None)
+        if standby:
+            env[STANDBY_ENV] = "1"
+        return subprocess.Popen(self.cmd, env=env, stdin=subprocess.PIPE if standby else subprocess.DEVNULL)
+
+    def _promote(self) -> subprocess.Popen:
+        spare, self.spare = self.spare, None
+        if spare is not None and spare.poll() is None:
+            try:
+                spare.stdin.write(b"go\n")
+                spare.stdin.flush()
+                return spare
+            except OSError:
+                pass
+        return self._spawn(False)
+
+    def start(self):
+        self.worker = self._spawn(False)
+        self._started = time.time()
+        if self.standby:
+            self.spare = self._spawn(True)
+        log({"event": "SUPERVISOR_START", "pid": self.worker.pid, "standby": self.spare.pid if self.spare else None})
+
+    def stalled(self, now: float | None = None) -> bool:
+        now = time.time() if now is None else now
+        # a new worker gets startup_grace_sec for its first beat; after that stall_sec between beats
+        last = _mtime(self.heartbeat_path)
+        if last >= self._started:
+            return now - last > self.stall_sec
+        return now - self._started > self.startup_grace_sec
+
+    def _count_restart(self):
+        """Worker and spare restarts share one budget; too many in `window_sec` stops everything."""
+        now = time.time()
+        self.restarts.append(now)
+        while self.restarts and now - self.restarts[0] > self.window_sec:
+            self.restarts.popleft()
+        if len(self.restarts) > self.max_restarts:
+            alert(f"SUPERVISOR giving up: {len(self.restarts)} restarts in {self.window_sec / 60:.0f}m")
+            self.stop()
+            raise SystemExit(f"Restart loop: {len(self.restarts)} restarts")
+
+    def check(self) -> str | None:
+        """One supervision step; returns why the worker was replaced, if it was."""
+        if self.spare is not None and self.spare.poll() is not None:
+            log({"event": "STANDBY_EXITED", "pid": self.spare.pid, "code": self.spare.returncode})
+            self.spare = None
+            # a spare that dies on startup would otherwise be respawned every poll, forever
+            self._count_restart()
+            self.spare = self._spawn(True)
+        code = self.worker.poll()
+        if code is None and not self.stalled():
+            return None
+        reason = "exited" if code is not None else "stalled"
+        old = self.worker
+        if code is None:
+            old.kill()  # hung in a syscall or C extension; SIGTERM may never be handled
+            old.wait()
+        log({"event": f"WORKER_{reason.upper()}", "pid": old.pid, "code": old.returncode,
+             "heartbeat_age": time.time() - _mtime(self.heartbeat_path)})
+
+        self._count_restart()
+        t0 = time.perf_counter()
+        self.worker = self._promote()
+        self._started = time.time()
+        if self.standby:
+            self.spare = self._spawn(True)
+        log({"event": "FAILOVER", "reason": reason, "pid": self.worker.pid, "ms": (time.perf_counter() - t0) * 1e3})
+        alert(f"Worker {old.pid} {reason}; now {self.worker.pid}")
+        return reason
+
+    def stop(self, timeout: float = 10.0):
+        for p in (self.spare, self.worker):
+            if p is None or p.poll() is not None:
+                continue
+            p.terminate()
+            try:
+                p.wait(timeout)
+            except subprocess.TimeoutExpired:
+                p.kill()
+                p.wait()
+
+    def run(self, poll_sec: float = 1.0):
+        self.start()
+        try:
+            while True:
+                self.check()
+                time.sleep(poll_sec)
+        finally:
+            self.stop()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m beastbot.supervisor")
+    ap.add_argument("--standby", action="store_true", help="keep a pre-warmed spare worker for fast failover")
+    ap.add_argument("--stall-sec", type=float, default=float(os.getenv("STALL_SEC", "300")))
+    ap.add_argument("--startup-grace-sec", type=float, default=180.0)
+    args = ap.parse_args(argv)
+    Supervisor(stall_sec=args.stall_sec, startup_grace_sec=args.startup_grace_sec, standby=args.standby).run()
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,297 @@
-
 from __future__ import annotations
 
+import atexit
 import json
-
 import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
 
-import urllib.request
+from . import metrics
 
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
 
+# events without an explicit "level" key; anything unlisted is INFO
+EVENT_LEVELS = {
+    "DATA": "DEBUG",
+    "HALTED": "WARNING",
+    "ORDER_TTL": "WARNING",
+    "ORDER_FALLBACK": "WARNING",
+    "RATE_LIMITED": "WARNING",
+    "WORKER_STALLED": "WARNING",
+    "WORKER_EXITED": "WARNING",
+    "STANDBY_EXITED": "WARNING",
+    "CRASH": "ERROR",
+}
 
-def log(event: dict):
 
-    print(json.dumps(event, default=str))
+def _default(o):
+    # Timestamps/datetimes: isoformat is cheaper than str() and unambiguous
+    iso = getattr(o, "isoformat", None)
+    return iso() if iso is not None else str(o)
 
 
+class StdoutSink:
+    def write(self, line: str):
+        sys.stdout.write(line)
 
-def alert(text: str):
+    def flush(self):
+        sys.stdout.flush()
 
-    token = os.getenv("TELEGRAM_BOT_TOKEN")
+    def close(self):
+        self.flush()
 
-    chat_id = os.getenv("TELEGRAM_CHAT_ID")
 
-    if not token or not chat_id:
+class FileSink:
+    """Buffered NDJSON writer that rotates to path.1 .. path.N by size or age.
+
+    Buffered lines reach the file within `flush_sec` even if nothing else is logged:
+    the first line into an empty buffer arms a one-shot timer that flushes it.
+    """
+
+    def __init__(self, path, max_bytes: int = 50_000_000, max_age_sec: float = 86400.0, backups: int = 5,
+                 buffer_events: int = 512, flush_sec: float = 1.0):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age_sec = max_age_sec
+        self.backups = backups
+        self.buffer_events = buffer_events
+        self.flush_sec = flush_sec
+        self._lock = threading.Lock()
+        self._buf: list[str] = []
+        self._timer: threading.Timer | None = None
+        self._open()
+
+    def _open(self):
+        self._f = open(self.path, "a", encoding="utf-8")
+        self._size = self._f.tell()
+        self._opened = time.monotonic()
+        self._last_flush = self._opened
+
+    def _rotate(self):
+        self._f.close()
+        for i in range(self.backups - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self._open()
+
+    def _flush_locked(self):
+        if self._buf:
+            data = "".join(self._buf)
+            self._buf.clear()
+            self._f.write(data)
+            self._size += len(data)
+        self._f.flush()
+        now = time.monotonic()
+        self._last_flush = now
+        if self._size >= self.max_bytes or (self._size and now - self._opened >= self.max_age_sec):
+            self._rotate()
+
+    def _timed_flush(self):
+        with self._lock:
+            self._timer = None
+            if not self._f.closed:
+                self._flush_locked()
+
+    def write(self, line: str):
+        with self._lock:
+            self._buf.append(line)
+            if len(self._buf) >= self.buffer_events or time.monotonic() - self._last_flush >= self.flush_sec:
+                self._flush_locked()
+            elif self._timer is None:
+                # the live loop logs a few events and then sleeps; don't leave them in memory meanwhile
+                self._timer = threading.Timer(self.flush_sec, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._flush_locked()
+            self._f.close()
+
+
+_sinks: list = [StdoutSink()]
+_level = LEVELS["INFO"]
+_sample: dict[str, int] = {}
+_seen: dict[str, int] = {}
+
+
+def configure(sinks: list | None = None, level: str = "INFO", sample: dict[str, int] | None = None):
+    """Replace the event sinks. `sample` keeps 1 in N events per event type, e.g. {"DATA": 10}."""
+    global _sinks, _level, _sample
+    for s in _sinks:
+        s.flush()
+    _sinks = list(sinks) if sinks is not None else [StdoutSink()]
+    _level = LEVELS[level.upper()]
+    _sample = dict(sample or {})
+    _seen.clear()
+
+
+def configure_from_env():
+    """LOG_FILE, LOG_LEVEL, LOG_SAMPLE ("DATA=10,ORDER_SUBMIT=2") and METRICS_PORT."""
+    sinks = [StdoutSink()]
+    if os.getenv("LOG_FILE"):
+        sinks.append(FileSink(os.getenv("LOG_FILE"), max_bytes=int(os.getenv("LOG_MAX_BYTES", "50000000"))))
+    sample = {}
+    for part in filter(None, os.getenv("LOG_SAMPLE", "").split(",")):
+        name, n = part.split("=")
+        sample[name.strip()] = int(n)
+    configure(sinks, os.getenv("LOG_LEVEL", "INFO"), sample)
+    if os.getenv("METRICS_PORT"):
+        metrics.serve(int(os.getenv("METRICS_PORT")))
+
 
+def flush_logs():
+    for s in _sinks:
+        s.flush()
+
+
+def log(event: dict):
+    name = event.get("event", "")
+    metrics.inc("beastbot_events_total", event=name)
+    lvl = event.get("level") or EVENT_LEVELS.get(name, "INFO")
+    if LEVELS.get(lvl, 20) < _level:
         return
+    n = _sample.get(name)
+    if n:
+        c = _seen[name] = _seen.get(name, 0) + 1
+        if (c - 1) % n:
+            return
+    line = json.dumps(event, default=_default) + "\n"
+    for s in _sinks:
+        s.write(line)
 
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
 
+def _telegram_send(text: str):
+    import urllib.request
+    token = os.getenv("TELEGRAM_BOT_TOKEN")
+    chat_id = os.getenv("TELEGRAM_CHAT_ID")
+    base = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+    url = f"{base}/bot{token}/sendMessage"
     payload = json.dumps({"chat_id": chat_id, "text": text}).encode("utf-8")
-
     req = urllib.request.Request(url, data=payload, headers={"Content-Type": "application/json"})
+    urllib.request.urlopen(req, timeout=10).read()
+
+
+class AlertQueue:
+    """Bounded alert queue drained by a background thread.
+
+    push() never blocks: identical messages still waiting are coalesced into one
+    ("... (x3)") and new ones are dropped when the queue is full. The worker
+    spaces sends by `min_interval_sec` and retries failures with exponential backoff.
+    """
+
+    def __init__(self, send=_telegram_send, maxsize: int = 256, min_interval_sec: float = 1.0,
+                 max_retries: int = 3, backoff_sec: float = 1.0):
+        self.send = send
+        self.min_interval_sec = min_interval_sec
+        self.max_retries = max_retries
+        self.backoff_sec = backoff_sec
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self._q: queue.Queue = queue.Queue(maxsize)
+        self._pending: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._last_send = 0.0
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="alerts", daemon=True)
+        self._thread.start()
+
+    def push(self, text: str) -> bool:
+        with self._lock:
+            if text in self._pending:
+                self._pending[text] += 1
+                return True
+            try:
+                self._q.put_nowait(text)
+            except queue.Full:
+                self.dropped += 1
+                return False
+            self._pending[text] = 1
+            return True
 
-    try:
+    def _run(self):
+        while True:
+            text = self._q.get()
+            if text is None:
+                self._q.task_done()
+                return
+            with self._lock:
+                n = self._pending.pop(text, 1)
+            self._deliver(text if n == 1 else f"{text} (x{n})")
+            self._q.task_done()
+
+    def _deliver(self, text: str):
+        for attempt in range(self.max_retries + 1):
+            wait = self._last_send + self.min_interval_sec - time.monotonic()
+            if wait > 0 and not self._stop:
+                time.sleep(wait)
+            self._last_send = time.monotonic()
+            try:
+                self.send(text)
+                self.sent += 1
+                return
+            except Exception:
+                if attempt == self.max_retries or self._stop:
+                    break
+                time.sleep(self.backoff_sec * 2 ** attempt)
+        self.failed += 1
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far has been delivered or given up on."""
+        deadline = time.monotonic() + timeout
+        while self._q.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float = 5.0):
+        self.flush(timeout)
+        self._stop = True
+        try:
+            self._q.put_nowait(None)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=0.1)
+
+
+_alerts: AlertQueue | None = None
+_alerts_lock = threading.Lock()
+
+
+def _alert_queue() -> AlertQueue:
+    global _alerts
+    with _alerts_lock:
+        if _alerts is None:
+            _alerts = AlertQueue()
+            atexit.register(_alerts.close)
+        return _alerts
+
+
+def alert(text: str):
+    if not os.getenv("TELEGRAM_BOT_TOKEN") or not os.getenv("TELEGRAM_CHAT_ID"):
+        return
+    _alert_queue().push(text)
 
-        urllib.request.urlopen(req, timeout=10).read()
 
-    except Exception:
+def flush_alerts(timeout: float = 5.0) -> bool:
+    return _alerts.flush(timeout) if _alerts is not None else True
 
-        pass
 
+atexit.register(flush_logs)
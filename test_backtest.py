@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+from beastbot.backtest import RunStats
+from beastbot.optimizer_walkforward import max_drawdown
+
+def test_run_stats_match_materialized_curve():
+    rng = np.random.default_rng(3)
+    eq = np.cumprod(1 + rng.normal(0.0002, 0.01, 5000))
+    st = RunStats()
+    for i, e in enumerate(eq):
+        st.update(float(e), in_position=i % 4 == 0)
+    st.exit("TP"); st.exit("TP"); st.exit("TIME")
+    rets = np.diff(np.r_[1.0, eq]) / np.r_[1.0, eq[:-1]]
+    assert abs(st.max_dd + max_drawdown(pd.Series(np.r_[1.0, eq]))) < 1e-12
+    assert abs(st.mean - rets.mean()) < 1e-15
+    assert abs(st.std - rets.std(ddof=1)) < 1e-12
+    d = st.as_dict()
+    assert d["exposure"] == 0.25 and d["exits"] == {"TP": 2, "TIME": 1}
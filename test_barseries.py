@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+from beastbot.barseries import BarSeries
+from beastbot.bench import synthetic_bars
+from beastbot.runner_paper import resample_15m_4h
+
+def test_ring_window_and_zero_copy():
+    df = synthetic_bars(500, freq="1h")
+    bs = BarSeries.from_frame(df.iloc[:100], capacity=168)
+    for ts, row in df.iloc[100:].iterrows():
+        bs.append(ts.value, *row.to_numpy())
+    # refetched last bar overwrites instead of duplicating
+    bs.extend_frame(df.iloc[-2:] * 1.0)
+    f = bs.to_frame()
+    assert len(bs) == 168 and np.shares_memory(f["close"].to_numpy(), bs.close)
+    pd.testing.assert_frame_equal(f, df.iloc[-168:], check_freq=False, check_index_type=False)
+
+def test_resample_matches_pandas():
+    df = synthetic_bars(300, freq="1h")
+    bs = BarSeries.from_frame(df)
+    df15, df4 = resample_15m_4h(df)
+    pd.testing.assert_frame_equal(bs.resample("15min").to_frame(), df15, check_freq=False, check_index_type=False)
+    pd.testing.assert_frame_equal(bs.resample("4h").to_frame(), df4, check_freq=False, check_index_type=False)
@@ -0,0 +1,18 @@
+import tempfile
+from beastbot.bench import compare, run_bench
+
+def test_compare_flags_regressions_only():
+    base = {"a@10": {"sec": 0.100, "peak_mb": 10.0}, "b@10": {"sec": 0.100, "peak_mb": 10.0}}
+    res = {"a@10": {"sec": 0.110, "peak_mb": 10.5}, "b@10": {"sec": 0.200, "peak_mb": 20.0}, "c@10": {"sec": 9.0, "peak_mb": 9.0}}
+    regs = compare(res, base, tolerance=0.25)
+    assert len(regs) == 2 and all(r.startswith("b@10") for r in regs)
+
+def test_run_bench_smoke():
+    r = run_bench("compute_signals", 2000, repeat=1)
+    assert r["sec"] > 0 and r["peak_mb"] > 0
+
+def test_benches_clean_up_scratch_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    for name in ("backtest_columnar_1m", "save_positions", "journal_append_x200"):
+        run_bench(name, 100, repeat=1)
+    assert list(tmp_path.iterdir()) == []
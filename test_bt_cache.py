@@ -0,0 +1,41 @@
+from dataclasses import replace
+from beastbot.config import BotConfig
+from beastbot.bench import synthetic_bars
+from beastbot.runner_paper import resample_15m_4h
+from beastbot import bt_cache
+from beastbot.bt_cache import ResultCache, config_fingerprint, data_fingerprint
+from beastbot import optimizer_walkforward as ow
+
+def _frames(n=400, seed=0):
+    return resample_15m_4h(synthetic_bars(n, seed=seed, sigma=0.003))
+
+def test_fingerprints_are_canonical():
+    assert config_fingerprint(BotConfig()) == config_fingerprint(BotConfig())
+    assert config_fingerprint(BotConfig()) != config_fingerprint(replace(BotConfig(), total_costs=0.006))
+    a15, a4 = _frames()
+    b15, b4 = _frames(seed=1)
+    assert data_fingerprint(a15, a4) == data_fingerprint(a15.copy(), a4.copy())
+    assert data_fingerprint(a15, a4) != data_fingerprint(b15, b4)
+
+def test_evaluate_hits_cache(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path)
+    df15, df4 = _frames()
+    first = ow.evaluate(BotConfig(), df15, df4, "SOL/USD", 1000.0, cache)
+    monkeypatch.setattr(ow, "backtest_symbol", lambda *a, **k: (_ for _ in ()).throw(AssertionError("recomputed")))
+    assert ow.evaluate(BotConfig(), df15, df4, "SOL/USD", 1000.0, cache) == first
+    assert cache.hits == 1
+
+def test_engine_version_invalidates_results(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path)
+    df15, df4 = _frames()
+    ow.evaluate(BotConfig(), df15, df4, "SOL/USD", 1000.0, cache)
+    monkeypatch.setattr(bt_cache, "ENGINE_VERSION", bt_cache.ENGINE_VERSION + 1)
+    ow.evaluate(BotConfig(), df15, df4, "SOL/USD", 1000.0, cache)
+    assert cache.hits == 0 and cache.misses == 2
+
+def test_size_eviction(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=3000)
+    for i in range(10):
+        cache.put(f"k{i}", b"x" * 1000)
+    assert sum(p.stat().st_size for p in tmp_path.iterdir()) <= 3000
+    assert cache.get("k9") is not None and cache.get("k0") is None
@@ -0,0 +1,40 @@
+import threading
+from datetime import datetime, timezone
+import pandas as pd
+from beastbot.risk import RiskState
+from beastbot.barseries import BarSeries
+from beastbot.checkpoint import Checkpoint, save_checkpoint, load_checkpoint
+
+def _bars(start, n):
+    idx = pd.date_range(start, periods=n, freq="1h", tz="UTC")
+    return pd.DataFrame({c: range(n) for c in ("open", "high", "low", "close", "volume")}, index=idx, dtype=float)
+
+def test_checkpoint_roundtrip(tmp_path):
+    rs = RiskState(day_start_equity=1.02, consec_losses=2, halted=True, reason="X")
+    ck = Checkpoint(datetime.now(timezone.utc), 0.97, rs, {"SOL/USD": BarSeries.from_frame(_bars("2025-01-01", 10), capacity=168)})
+    save_checkpoint(ck, tmp_path / "ck.bin")
+    back = load_checkpoint(tmp_path / "ck.bin")
+    assert back.equity == 0.97 and back.risk == rs
+    assert back.bars["SOL/USD"].capacity == 168
+    assert back.bars["SOL/USD"].to_frame().equals(ck.bars["SOL/USD"].to_frame())
+
+def test_concurrent_saves_never_tear(tmp_path):
+    path = tmp_path / "ck.bin"
+    bars = {"SOL/USD": BarSeries.from_frame(_bars("2025-01-01", 168), capacity=168)}
+    errors = []
+
+    def writer(eq):
+        for _ in range(30):
+            try:
+                save_checkpoint(Checkpoint(datetime.now(timezone.utc), eq, RiskState(), bars), path)
+            except OSError as e:  # e.g. the other writer renamed the shared temp file away
+                errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(eq,)) for eq in (0.9, 1.1)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert load_checkpoint(path).equity in (0.9, 1.1)
+    assert [p.name for p in tmp_path.iterdir()] == ["ck.bin"]
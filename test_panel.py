@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+from beastbot.config import BotConfig
+from beastbot.strategy import compute_signals
+from beastbot.panel import stack_panel, compute_signals_panel, ema, rolling_std
+from beastbot.bench import synthetic_bars
+from beastbot.runner_paper import resample_15m_4h
+
+def test_panel_matches_per_symbol_signals():
+    d15 = {s: synthetic_bars(6000, seed=i) for i, s in enumerate(["SOL/USD", "DOGE/USD"])}
+    d4 = {s: resample_15m_4h(df)[1] for s, df in d15.items()}
+    cfg = BotConfig()
+    p = compute_signals_panel(cfg, stack_panel(d15), stack_panel(d4))
+    for s in d15:
+        ref = compute_signals(cfg, d15[s], d4[s], s)
+        pd.testing.assert_series_equal(p["trend"][s], ref["trend"], check_names=False, check_index_type=False, rtol=0, atol=0)
+        assert (p["gate"][s].to_numpy() == ref["gate"].astype(bool).to_numpy()).all()
+        assert (p["entry"][s].to_numpy() == ref["entry"].to_numpy()).all()
+        assert ref["entry"].any()
+
+def test_stack_panel_outer_joins_and_kernels_handle_gaps():
+    a, b = synthetic_bars(300, seed=0), synthetic_bars(300, seed=1).iloc[::2]
+    p = stack_panel({"A": a, "B": b})
+    assert len(p) == 300 and np.isnan(p["close"][1, 1])
+    x = p["close"]
+    pd.testing.assert_frame_equal(pd.DataFrame(ema(x, 20)), pd.DataFrame(x).ewm(span=20, adjust=False).mean(), rtol=0, atol=0)
+    np.testing.assert_allclose(rolling_std(x, 20), pd.DataFrame(x).rolling(20).std().to_numpy(), rtol=1e-8)
@@ -0,0 +1,26 @@
+import time
+from beastbot.profiler import StageProfiler, SamplingProfiler
+
+def test_stage_percentiles():
+    p = StageProfiler(window=100)
+    for i in range(1, 201):
+        p.record("fetch", i * 1_000_000)
+    with p.span("signals"):
+        pass
+    s = p.summary()
+    assert s["fetch"]["n"] == 200
+    assert s["fetch"]["p50_ms"] <= s["fetch"]["p95_ms"] <= s["fetch"]["p99_ms"] <= s["fetch"]["max_ms"] == 200.0
+    assert s["fetch"]["p50_ms"] >= 101.0  # rolling window keeps only the last 100 samples
+    assert s["signals"]["n"] == 1
+
+def test_disabled_spans_record_nothing_and_sampler_runs():
+    p = StageProfiler(enabled=False)
+    with p.span("x"):
+        pass
+    assert p.summary() == {}
+    sp = SamplingProfiler(interval_sec=0.001).start()
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < 0.1:
+        sum(range(1000))
+    sp.stop()
+    assert sp.top(1)
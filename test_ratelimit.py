@@ -0,0 +1,60 @@
+import threading
+import time
+import pytest
+from beastbot import metrics
+from beastbot.ratelimit import RequestScheduler, RateLimited, ORDER, CANCEL, STATUS, DATA
+
+def test_reserve_keeps_tokens_for_orders():
+    s = RequestScheduler({"ex": (0.001, 10)})
+    for _ in range(5):
+        s.acquire("ex", DATA, timeout=0)  # data may only spend down to half the burst
+    with pytest.raises(RateLimited):
+        s.acquire("ex", DATA, timeout=0)
+    s.acquire("ex", STATUS, timeout=0)
+    s.acquire("ex", ORDER, timeout=0)
+
+def test_orders_jump_the_queue_and_backpressure_sheds_low_priority():
+    s = RequestScheduler({"ex": (20.0, 1)}, max_waiting=2)
+    s.acquire("ex", ORDER)
+    done = []
+    def run(p):
+        s.acquire("ex", p)
+        done.append(p)
+    ts = [threading.Thread(target=run, args=(p,)) for p in (DATA, ORDER)]
+    for t in ts:
+        t.start()
+        time.sleep(0.01)
+    with pytest.raises(RateLimited):
+        s.acquire("ex", DATA)
+    for t in ts:
+        t.join(2)
+    assert done == [ORDER, DATA]
+
+def test_full_queue_still_admits_cancels_and_status_polls():
+    s = RequestScheduler({"ex": (20.0, 1)}, max_waiting=2)
+    s.acquire("ex", ORDER)
+    ts = [threading.Thread(target=s.acquire, args=("ex", DATA)) for _ in range(2)]
+    for t in ts:
+        t.start()
+    time.sleep(0.01)
+    with pytest.raises(RateLimited):
+        s.acquire("ex", DATA)
+    s.acquire("ex", CANCEL, timeout=1)
+    s.acquire("ex", STATUS, timeout=1)
+    for t in ts:
+        t.join(2)
+
+def test_call_backs_off_and_retries_on_429():
+    s = RequestScheduler({"ex": (1000.0, 5)}, backoff_sec=0.01)
+    before = metrics.REGISTRY.get("beastbot_requests_throttled_total", endpoint="ex") or 0
+    calls = []
+    class APIError(Exception):
+        status_code = 429
+    def fn(x):
+        calls.append(x)
+        if len(calls) == 1:
+            raise APIError("too many requests")
+        return x * 2
+    assert s.call("ex", ORDER, fn, 21) == 42
+    assert len(calls) == 2
+    assert metrics.REGISTRY.get("beastbot_requests_throttled_total", endpoint="ex") == before + 1
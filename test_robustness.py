@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+from beastbot.optimizer_walkforward import max_drawdown
+from beastbot.robustness import max_drawdown_paths, monte_carlo, resample_trades
+
+def test_drawdown_matches_scalar_helper():
+    rets = np.random.default_rng(3).normal(0, 0.05, (4, 50))
+    eq = np.cumprod(1 + rets, axis=1)
+    dd = max_drawdown_paths(eq)
+    for i in range(4):
+        expected = -max_drawdown(pd.Series(np.r_[1.0, eq[i]]))
+        assert abs(dd[i] - expected) < 1e-12
+
+def test_monte_carlo_distributions():
+    trades = pd.DataFrame({"pnl_pct": [0.05, -0.02, 0.03, -0.04, 0.06, -0.01]})
+    shuf = monte_carlo(trades, 2000, method="shuffle")
+    total = float(np.prod(1 + trades["pnl_pct"]) - 1)
+    assert abs(shuf["ret_p05"] - total) < 1e-12 and abs(shuf["ret_p95"] - total) < 1e-12
+    assert 0 <= shuf["dd_p05"] <= shuf["dd_p50"] <= shuf["dd_p95"]
+    boot = monte_carlo(trades, 2000, block=2, seed=7)
+    assert boot == monte_carlo(trades, 2000, block=2, seed=7)
+    assert boot["ret_p05"] < total < boot["ret_p95"]
+    assert resample_trades(trades["pnl_pct"].to_numpy(), 10, block=4).shape == (10, 6)
+    assert monte_carlo(pd.DataFrame([]), 100)["n_trades"] == 0
@@ -0,0 +1,47 @@
+import pytest
+from beastbot import runner_live
+from beastbot.bench import synthetic_bars
+from beastbot.checkpoint import load_checkpoint
+from beastbot.state import PositionJournal, load_positions
+from beastbot.strategy import Position
+
+class _Stop(BaseException):
+    pass
+
+class _Broker:
+    def sell_qty(self, sym, qty):
+        return qty, 90.0
+
+class _Monitor:
+    def __init__(self, *a, **k): pass
+    def start(self): return self
+
+def test_close_is_checkpointed_even_if_the_loop_pass_fails(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for var in ("METRICS_PORT", "LOG_FILE", runner_live.STANDBY_ENV, "PROFILE_SAMPLE_MS"):
+        monkeypatch.delenv(var, raising=False)
+    bars = synthetic_bars(500, freq="1h")
+    j = PositionJournal(fsync=False)
+    j.open(Position("SOL/USD", 1.0, 100.0, bars.index[0], 0.08, 1.0))  # TP already hit
+    j.shutdown()
+
+    def fetch(sym, **kwargs):
+        if sym != "SOL/USD":
+            raise RuntimeError("feed down")
+        return bars
+
+    def sleep(sec):
+        raise _Stop()
+
+    monkeypatch.setattr(runner_live, "HISTORY_BARS", 500)
+    monkeypatch.setattr(runner_live, "make_exchange", lambda: None)
+    monkeypatch.setattr(runner_live, "RealBroker", lambda ex, cfg: _Broker())
+    monkeypatch.setattr(runner_live, "RiskMonitor", _Monitor)
+    monkeypatch.setattr(runner_live, "fetch_crypto_bars", fetch)
+    monkeypatch.setattr(runner_live.time, "sleep", sleep)
+    with pytest.raises(_Stop):
+        runner_live.run()  # SOL exits at TP, then DOGE raises and the pass never reaches its checkpoint
+
+    assert load_positions() == {}
+    ck = load_checkpoint()
+    assert ck is not None and ck.equity < 0.95 and ck.risk.consec_losses == 1
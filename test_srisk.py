@@ -14,3 +14,23 @@ def test_consec_losses_halt():
         on_trade_close(rs, -0.01)
     check_breakers(rs, 1.0, 0.99, 0.99, 4)
     assert rs.halted
+
+def test_mtm_monitor_halts_on_open_drawdown():
+    import pandas as pd
+    from beastbot.config import BotConfig
+    from beastbot.strategy import Position
+    from beastbot.risk import mark_to_market
+    from beastbot.risk_monitor import RiskMonitor
+    cfg = BotConfig()
+    rs = RiskState()
+    update_period_starts(rs, datetime.now(timezone.utc), 1.0)
+    positions = {"SOL/USD": Position("SOL/USD", 1.0, 100.0, pd.Timestamp("2025-01-01T00:00:00Z"), 0.08, 108.5)}
+    assert abs(mark_to_market(1.0, positions, {"SOL/USD": 110.0}, 0.0) - 1.10) < 1e-12
+    quotes = {"SOL/USD": 99.0}
+    halts = []
+    mon = RiskMonitor(cfg, rs, positions, lambda: 1.0, lambda syms: {s: quotes[s] for s in syms}, on_halt=halts.append)
+    mon.tick()
+    assert not rs.halted
+    quotes["SOL/USD"] = 90.0
+    mon.tick()
+    assert rs.halted and halts == [rs.reason] and rs.reason.startswith("DAILY_DD")
@@ -0,0 +1,4 @@
+from beastbot.bench import check_startup
+
+def test_runners_start_within_budget_without_heavy_deps():
+    assert check_startup() == []
@@ -0,0 +1,42 @@
+import pandas as pd
+from beastbot.strategy import Position
+from beastbot.state import PositionJournal, load_positions
+
+def _pos(sym, px=100.0):
+    return Position(sym, qty=1.0, entry_price=px, entry_time=pd.Timestamp("2025-01-01T00:00:00Z"), raw_tp=0.08, tp_price=px*1.085)
+
+def test_journal_replay(tmp_path):
+    paths = dict(state_path=tmp_path / "state.json", journal_path=tmp_path / "state.journal")
+    j = PositionJournal(snapshot_every=1000, fsync=False, **paths)
+    j.open(_pos("SOL/USD"))
+    j.open(_pos("DOGE/USD", 0.1))
+    j.close("SOL/USD")
+    # crash mid-append: torn last line must be ignored
+    with open(paths["journal_path"], "a") as f:
+        f.write('{"op":"close","sym":"DO')
+    pos = load_positions(**paths)
+    assert list(pos) == ["DOGE/USD"]
+    assert pos["DOGE/USD"].entry_price == 0.1
+
+def test_restart_after_torn_write_keeps_later_events(tmp_path):
+    paths = dict(state_path=tmp_path / "state.json", journal_path=tmp_path / "state.journal")
+    j = PositionJournal(snapshot_every=1000, fsync=False, **paths)
+    j.open(_pos("A/USD"))
+    with open(paths["journal_path"], "a") as f:
+        f.write('{"op":"close","sym":"A/')
+    j = PositionJournal.load(snapshot_every=1000, fsync=False, **paths)
+    j.open(_pos("B/USD"))
+    j.close("A/USD")
+    j = PositionJournal.load(snapshot_every=1000, fsync=False, **paths)
+    assert list(j.positions) == ["B/USD"]
+    assert list(load_positions(**paths)) == ["B/USD"]
+
+def test_journal_compaction(tmp_path):
+    paths = dict(state_path=tmp_path / "state.json", journal_path=tmp_path / "state.journal")
+    j = PositionJournal(snapshot_every=3, fsync=False, **paths)
+    for i in range(4):
+        j.open(_pos(f"S{i}/USD"))
+    assert paths["journal_path"].read_text().count("\n") == 1
+    j.shutdown()
+    assert paths["journal_path"].read_text() == ""
+    assert sorted(load_positions(**paths)) == [f"S{i}/USD" for i in range(4)]
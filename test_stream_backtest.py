@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+from beastbot.config import BotConfig
+from beastbot.backtest import backtest_symbol, RunStats
+from beastbot.stream_backtest import write_columnar, backtest_columnar
+from beastbot.bench import synthetic_bars
+from beastbot.runner_paper import resample_15m_4h
+
+def test_streaming_matches_in_memory_backtest(tmp_path):
+    n = 45 * 24 * 60
+    df = synthetic_bars(n, freq="1min", seed=5, sigma=0.0015, drift=0.00001, start="2024-01-01 00:07")
+    df = df.drop(df.index[np.random.default_rng(5).random(n) < 0.02])  # gaps, so buckets straddle chunk edges unevenly
+    df15, df4 = resample_15m_4h(df)
+
+    cfg = BotConfig()
+    st, st2 = RunStats(), RunStats()
+    eq, trades = backtest_symbol(cfg, df15, df4, "SOL/USD", stats=st)
+    write_columnar(df, tmp_path)
+    eq2, trades2 = backtest_columnar(cfg, tmp_path, "SOL/USD", chunk_rows=7777, stats=st2)
+    assert len(trades) > 5
+    assert abs(eq - eq2) < 1e-12
+    pd.testing.assert_frame_equal(trades, trades2, check_dtype=False)  # ts resolution may differ
+    assert st.bars == len(df15) and st.exits == st2.exits and sum(st.exits.values()) == len(trades)
+    assert abs(st.max_dd - st2.max_dd) < 1e-12 and st.max_dd > 0
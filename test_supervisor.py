@@ -0,0 +1,61 @@
+import sys
+import time
+import pytest
+from beastbot.supervisor import Supervisor
+
+WORKER = """
+import os, sys, time
+hb = os.environ["HEARTBEAT_PATH"]
+if os.environ.get("BEASTBOT_STANDBY") and not sys.stdin.readline():
+    sys.exit(0)
+with open(hb + ".started", "a") as f:
+    f.write(f"{os.getpid()}\\n")
+for _ in range(3):
+    open(hb, "w").write("x")
+    time.sleep(0.1)
+time.sleep(60)  # hung: no more heartbeats
+"""
+
+# the spare can't start (e.g. the port it wants is taken); the active worker is healthy
+BAD_SPARE = """
+import os, sys, time
+if os.environ.get("BEASTBOT_STANDBY"):
+    sys.exit(1)
+while True:
+    open(os.environ["HEARTBEAT_PATH"], "w").write("x")
+    time.sleep(0.1)
+"""
+
+def test_stalled_worker_is_killed_and_standby_promoted(tmp_path):
+    hb = tmp_path / "hb"
+    sup = Supervisor([sys.executable, "-c", WORKER], hb, stall_sec=0.5, startup_grace_sec=5, standby=True)
+    sup.start()
+    try:
+        first, spare = sup.worker, sup.spare
+        deadline = time.time() + 15
+        reason = None
+        while reason is None and time.time() < deadline:
+            reason = sup.check()
+            time.sleep(0.05)
+        assert reason == "stalled"
+        assert first.poll() is not None
+        assert sup.worker is spare and sup.spare is not None and sup.spare is not spare
+        while time.time() < deadline and str(spare.pid) not in (tmp_path / "hb.started").read_text():
+            time.sleep(0.05)
+        assert (tmp_path / "hb.started").read_text().split() == [str(first.pid), str(spare.pid)]
+    finally:
+        sup.stop()
+
+def test_crashing_spare_counts_toward_restart_limit(tmp_path):
+    sup = Supervisor([sys.executable, "-c", BAD_SPARE], tmp_path / "hb", stall_sec=5, startup_grace_sec=5,
+                     standby=True, max_restarts=2)
+    sup.start()
+    try:
+        deadline = time.time() + 15
+        with pytest.raises(SystemExit):
+            while time.time() < deadline:
+                assert sup.check() is None
+                time.sleep(0.05)
+        assert len(sup.restarts) == 3 and sup.worker.poll() is not None
+    finally:
+        sup.stop()
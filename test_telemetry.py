@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from beastbot.telemetry import AlertQueue, _telegram_send
+
+def _server(delay=0.0):
+    got = []
+    class H(BaseHTTPRequestHandler):
+        def do_POST(self):
+            time.sleep(delay)
+            got.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(200); self.end_headers(); self.wfile.write(b"{}")
+        def log_message(self, *a): pass
+    srv = HTTPServer(("127.0.0.1", 0), H)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, got
+
+def test_alerts_coalesce_and_flush(monkeypatch):
+    srv, got = _server()
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "t")
+    monkeypatch.setenv("TELEGRAM_CHAT_ID", "c")
+    monkeypatch.setenv("TELEGRAM_API_URL", f"http://127.0.0.1:{srv.server_port}")
+    q = AlertQueue(_telegram_send, min_interval_sec=0.0)
+    q.push("first")
+    time.sleep(0.2)
+    for _ in range(3):
+        q.push("STALE")
+    assert q.flush(5.0)
+    q.close(); srv.shutdown()
+    texts = [m["text"] for m in got]
+    assert texts[0] == "first" and texts[-1].startswith("STALE")
+    assert len(texts) <= 3 and q.sent == len(texts)
+
+def test_push_never_blocks_and_retries():
+    calls = []
+    def flaky(text):
+        calls.append(text)
+        time.sleep(0.05)
+        if len(calls) == 1:
+            raise OSError("down")
+    q = AlertQueue(flaky, maxsize=2, min_interval_sec=0.0, backoff_sec=0.01)
+    t0 = time.perf_counter()
+    ok = [q.push(f"m{i}") for i in range(10)]
+    assert time.perf_counter() - t0 < 0.05
+    assert not all(ok) and q.dropped > 0
+    assert q.flush(5.0)
+    assert calls[0] == calls[1] == "m0" and q.failed == 0
+    q.close()
+
+def test_file_sink_rotation_sampling_and_levels(tmp_path):
+    from beastbot import telemetry
+    path = tmp_path / "events.ndjson"
+    sink = telemetry.FileSink(path, max_bytes=40, backups=2, buffer_events=2)
+    telemetry.configure([sink], level="INFO", sample={"TICK": 5})
+    try:
+        for i in range(20):
+            telemetry.log({"event": "TICK", "i": i})
+        telemetry.log({"event": "DATA", "rows": 1})  # DEBUG, filtered
+        sink.flush()
+    finally:
+        telemetry.configure()
+    lines = []
+    for p in sorted(tmp_path.iterdir()):
+        lines += [json.loads(l) for l in p.read_text().splitlines()]
+    assert sorted(e["i"] for e in lines) == [0, 5, 10, 15]
+    assert (tmp_path / "events.ndjson.1").exists()
+
+def test_file_sink_flushes_when_idle(tmp_path):
+    from beastbot import telemetry
+    path = tmp_path / "events.ndjson"
+    sink = telemetry.FileSink(path, flush_sec=0.2)
+    try:
+        sink.write('{"event":"A"}\n')
+        sink.write('{"event":"B"}\n')
+        assert path.read_text() == ""
+        deadline = time.time() + 2.0
+        while path.read_text() == "" and time.time() < deadline:
+            time.sleep(0.02)
+        assert path.read_text().splitlines() == ['{"event":"A"}', '{"event":"B"}']
+        assert time.time() < deadline - 1.5
+    finally:
+        sink.close()
+
+def test_metrics_endpoint():
+    import urllib.request
+    from beastbot import metrics
+    reg = metrics.Metrics()
+    reg.inc("beastbot_events_total", event="HALTED")
+    reg.set("beastbot_equity", 0.98)
+    srv = metrics.serve(0, registry=reg)
+    body = urllib.request.urlopen(f"http://127.0.0.1:{srv.server_port}/metrics", timeout=5).read().decode()
+    srv.shutdown()
+    assert 'beastbot_events_total{event="HALTED"} 1.0' in body
+    assert "# TYPE beastbot_equity gauge\nbeastbot_equity 0.98" in body
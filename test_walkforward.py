@@ -0,0 +1,29 @@
+import random
+import pandas as pd
+from beastbot.config import BotConfig
+from beastbot.bench import synthetic_bars
+from beastbot.runner_paper import resample_15m_4h
+from beastbot.optimizer_walkforward import walk_forward, sample_trial
+
+def _data(days=91):
+    d15, d4 = {}, {}
+    for i, s in enumerate(BotConfig().symbols):
+        d15[s], d4[s] = resample_15m_4h(synthetic_bars(days * 96, seed=i, sigma=0.006))
+    return d15, d4
+
+def test_sample_trial_leaves_shared_dicts_alone():
+    before = dict(BotConfig.k_band)
+    a, b = sample_trial(BotConfig(), random.Random(0)), sample_trial(BotConfig(), random.Random(1))
+    assert BotConfig.k_band == before and a.k_band is not b.k_band and a.k_band != b.k_band
+
+def test_walk_forward_stitches_out_of_sample_windows():
+    d15, d4 = _data()
+    res = walk_forward(BotConfig(), d15, d4, trials=3, seed=1, workers=1)
+    assert len(res.splits) == 3
+    eq = res.equity
+    assert eq.index.is_monotonic_increasing and not eq.index.has_duplicates
+    assert eq.index[0] >= res.splits[0]["test"][0] and eq.index[-1] < res.splits[-1]["test"][1]
+    assert all(sp["train"][1] <= sp["test"][0] for sp in res.splits)
+    par = walk_forward(BotConfig(), d15, d4, trials=3, seed=1, workers=2)
+    pd.testing.assert_series_equal(par.equity, eq)
+    assert [sp["test_score"] for sp in par.splits] == [sp["test_score"] for sp in res.splits]